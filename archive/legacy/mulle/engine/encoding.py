@@ -0,0 +1,157 @@
+"""Fixed-shape encoding of training observations and a discrete action space.
+
+Observations are written into preallocated ``array`` buffers (float32 features,
+one byte per action for the legal-action mask), one row per game, so a batch of
+games is a single contiguous block that ``ObservationBuffer.as_numpy`` can wrap
+without copying.
+
+Feature row layout (``OBS_SIZE`` floats):
+
+* card planes, ``CARD_COUNT`` entries each, indexed by card id: in the
+  viewer's hand, on the board, captured by the viewer, captured by the
+  opponent, unseen by the viewer, and the board slot holding the card
+  (slot + 1, 0 when not on the board);
+* ``MAX_PILES`` pile slots in board order with ``PILE_FEATURES`` entries:
+  present, value, card count, build, own build, locked;
+* scalars: round number, hand size, opponent hand size, own tabbe, opponent tabbe.
+
+Actions are blocks of ``CARD_COUNT`` indices, one per card id, in
+``ACTION_KINDS`` order. Captures, trottas and discards have one block each,
+since the rules allow at most one of each per card. "build" and "build_down"
+have a block per board slot (``MAX_PILES`` each) for the pile the card goes
+onto. Every legal move thus has its own index, except that "discard" also
+covers feeding an own build, which is how the rules play a card that neither
+captures nor builds; a player with builds can only feed, one without can only
+discard.
+"""
+
+from array import array
+from typing import Dict, List
+
+from ..models.board import Board
+from ..models.build import Build
+from ..models.card import CARD_COUNT
+from ..models.cardset import FULL_MASK, iter_ids
+from ..models.move import Move
+from ..models.player import Player
+from ..rules.capture import TurnContext, legal_moves
+
+CARD_PLANES = 6
+MAX_PILES = 32
+PILE_FEATURES = 6
+SCALAR_FEATURES = 5
+_PILE_BASE = CARD_PLANES * CARD_COUNT
+_SCALAR_BASE = _PILE_BASE + MAX_PILES * PILE_FEATURES
+OBS_SIZE = _SCALAR_BASE + SCALAR_FEATURES
+
+ACTION_KINDS = ("capture", "build", "build_down", "trotta", "discard")
+_KIND_BLOCKS = {"capture": 1, "build": MAX_PILES, "build_down": MAX_PILES, "trotta": 1, "discard": 1}
+ACTION_COUNT = CARD_COUNT * sum(_KIND_BLOCKS.values())
+_KIND_BASE = {kind: CARD_COUNT * sum(_KIND_BLOCKS[k] for k in ACTION_KINDS[:i]) for i, kind in enumerate(ACTION_KINDS)}
+_KIND_BASE["feed"] = _KIND_BASE["discard"]
+
+_ZERO_FEATURES = array("f", bytes(4 * OBS_SIZE))
+_ZERO_MASK = array("B", bytes(ACTION_COUNT))
+
+
+def action_index(move: Move, board: Board) -> int:
+    """Index of ``move`` in the fixed action space; builds use their pile's slot on ``board``."""
+    if move.kind != "build":
+        return _KIND_BASE[move.kind] + move.card_id
+    kind = "build" if move.declared_value is None else "build_down"
+    slot = board.slot_of(board.get_pile(move.pile_ids[0]))
+    if slot >= MAX_PILES:
+        raise ValueError(f"Brädet har fler än {MAX_PILES} högar")
+    return _KIND_BASE[kind] + slot * CARD_COUNT + move.card_id
+
+
+def action_table(
+    board: Board, player: Player, ctx: TurnContext | None = None, moves: List[Move] | None = None
+) -> Dict[int, Move]:
+    """The move behind every legal action index for ``player``.
+
+    ``moves`` may pass in ``legal_moves`` already generated for this position.
+    """
+    if moves is None:
+        moves = legal_moves(board, player, ctx=ctx)
+    return {action_index(move, board): move for move in moves}
+
+
+def encode_observation(board: Board, viewer: Player, opponent: Player, round_number: int, out: array, row: int = 0):
+    """Write the features of ``viewer``'s view into row ``row`` of ``out``."""
+    base = row * OBS_SIZE
+    out[base:base + OBS_SIZE] = _ZERO_FEATURES
+    piles = board.piles
+    if len(piles) > MAX_PILES:
+        raise ValueError(f"Brädet har fler än {MAX_PILES} högar")
+
+    hand, own, other = viewer.hand_mask, viewer.captured_mask, opponent.captured_mask
+    seen = hand | board.card_mask | own | other
+    for plane, mask in enumerate((hand, board.card_mask, own, other, FULL_MASK & ~seen)):
+        offset = base + plane * CARD_COUNT
+        for cid in iter_ids(mask):
+            out[offset + cid] = 1.0
+
+    slots = base + 5 * CARD_COUNT
+    for slot, pile in enumerate(piles):
+        cards = pile.cards if isinstance(pile, Build) else pile
+        for c in cards:
+            out[slots + c.id] = slot + 1
+        offset = base + _PILE_BASE + slot * PILE_FEATURES
+        out[offset] = 1.0
+        out[offset + 1] = board.pile_value(pile)
+        out[offset + 2] = len(cards)
+        if isinstance(pile, Build):
+            out[offset + 3] = 1.0
+            out[offset + 4] = float(pile.owner == viewer.name)
+            out[offset + 5] = float(pile.locked)
+
+    offset = base + _SCALAR_BASE
+    out[offset] = round_number
+    out[offset + 1] = len(viewer.hand)
+    out[offset + 2] = len(opponent.hand)
+    out[offset + 3] = viewer.tabbe
+    out[offset + 4] = opponent.tabbe
+
+
+def encode_action_mask(table: Dict[int, Move], out: array, row: int = 0):
+    """Mark the legal indices of ``table`` in row ``row`` of ``out``."""
+    base = row * ACTION_COUNT
+    out[base:base + ACTION_COUNT] = _ZERO_MASK
+    for index in table:
+        out[base + index] = 1
+
+
+class ObservationBuffer:
+    """Preallocated feature and action-mask rows for ``rows`` games.
+
+    By default the rows live in private arrays. ``features`` and ``masks`` may
+    instead be existing writable buffers of the same layout (e.g. memoryviews
+    cast to "f" and "B" over shared memory).
+    """
+
+    def __init__(self, rows: int, features=None, masks=None):
+        self.rows = rows
+        self.features = array("f", bytes(4 * OBS_SIZE * rows)) if features is None else features
+        self.masks = array("B", bytes(ACTION_COUNT * rows)) if masks is None else masks
+        if len(self.features) != rows * OBS_SIZE or len(self.masks) != rows * ACTION_COUNT:
+            raise ValueError("Bufferten har fel storlek")
+
+    def feature_row(self, row: int) -> memoryview:
+        """Zero-copy view of one row; it changes when the row is rewritten."""
+        return memoryview(self.features)[row * OBS_SIZE:(row + 1) * OBS_SIZE]
+
+    def mask_row(self, row: int) -> memoryview:
+        return memoryview(self.masks)[row * ACTION_COUNT:(row + 1) * ACTION_COUNT]
+
+    def as_numpy(self):
+        """``(features, masks)`` as ``(rows, OBS_SIZE)`` float32 and ``(rows, ACTION_COUNT)`` bool arrays.
+
+        Shares memory with the buffer. Needs numpy, which is imported here so the
+        rest of the package keeps working without it.
+        """
+        import numpy as np
+
+        features = np.frombuffer(self.features, dtype=np.float32).reshape(self.rows, OBS_SIZE)
+        masks = np.frombuffer(self.masks, dtype=np.bool_).reshape(self.rows, ACTION_COUNT)
+        return features, masks
@@ -1,10 +1,11 @@
-import random
 from dataclasses import dataclass, field
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
 from ..models.board import Board
 from ..models.deck import Deck
 from ..models.player import Player
+from ..models.rng import derive_rng
+from ..models.zobrist import state_hash
 from ..rules.capture import (
     ActionResult,
     auto_play_turn,
@@ -21,12 +22,35 @@ from .learning_ai import SimpleLearningAI
 
 ActionSelector = Callable[[Board, Player, int], ActionResult]
 
+# How play_round/iter_session keep the executed actions
+RECORD_MODES = ("full", "compact", "none")
+
+
+class CompactAction(NamedTuple):
+    """Executed action reduced to card ids; holds no references to game objects."""
+    player: str
+    played: int
+    captured: Tuple[int, ...]
+    mulle_pairs: int
+    build_created: bool
+
+    @classmethod
+    def from_result(cls, player: str, result: ActionResult) -> "CompactAction":
+        return cls(
+            player,
+            result.played.id,
+            tuple(c.id for c in result.captured),
+            len(result.mulle_pairs),
+            result.build_created,
+        )
+
 
 @dataclass
 class RoundResult:
     round_index: int
     scores: List[ScoreBreakdown]
-    actions: List[Tuple[str, ActionResult]] = field(default_factory=list)
+    actions: List[Union[Tuple[str, ActionResult], CompactAction]] = field(default_factory=list)
+    omgang_index: int = 0
 
 
 @dataclass
@@ -45,15 +69,17 @@ class SessionResult:
 class GameEngine:
     """UI-agnostic game engine that owns deck, board and players."""
 
-    def __init__(self, seed: int = 42, ai_enabled: bool = True):
+    def __init__(self, seed: int = 42, ai_enabled: bool = True, compact_players: bool = False):
+        # Decks and AIs get their own streams derived from the seed and a label path,
+        # so each omgång replays the same way whatever was played before it
         self.seed = seed
-        random.seed(seed)
-        self.players = [Player("Anna"), Player("Bo")]
+        self.players = [Player("Anna", compact=compact_players), Player("Bo", compact=compact_players)]
         self.board = Board()
         # Use Optional[Deck] for compatibility with Python < 3.10
         self.deck: Optional[Deck] = None
-        self.ai = SimpleLearningAI(self.players[1]) if ai_enabled else None
+        self.ai = SimpleLearningAI(self.players[1], rng=derive_rng(seed, "ai", self.players[1].name)) if ai_enabled else None
         self.current_omgang = 0
+        self.round_number = 1
 
     # --- setup helpers ---
     def setup_initial_board(self) -> Board:
@@ -70,17 +96,17 @@ class GameEngine:
         if self.deck.remaining() < 16:
             raise RuntimeError("Inte nog kort kvar i leken för att dela ut händer (behöver 16)")
         for p in self.players:
-            p.hand.clear()
+            p.clear_hand()
             p.add_to_hand(self.deck.draw_many(8))
 
     def start_omgang(self, omgang_index: int):
         self.current_omgang = omgang_index
-        self.deck = Deck(seed=self.seed + omgang_index)
+        self.deck = Deck(rng=derive_rng(self.seed, "omgang", omgang_index, "deck"))
+        if self.ai:
+            self.ai.rng = derive_rng(self.seed, "omgang", omgang_index, self.ai.player.name)
         self.setup_initial_board()
         for p in self.players:
-            p.captured.clear()
-            p.mulles.clear()
-            p.tabbe = 0
+            p.reset_round()
 
     # --- action wrappers ---
     def play_capture(self, player: Player, card, chosen):
@@ -123,18 +149,25 @@ class GameEngine:
         round_index: int,
         starter_idx: int = 0,
         action_selector: Optional[ActionSelector] = None,
+        record: str = "full",
     ) -> RoundResult:
+        if record not in RECORD_MODES:
+            raise ValueError(f"Okänt record-läge: {record}")
         selector = action_selector or self._default_action_selector
         round_number = round_index + 1
+        self.round_number = round_number
         turn = starter_idx
-        executed_actions: List[Tuple[str, ActionResult]] = []
+        executed_actions: list = []
 
         while any(p.hand for p in self.players):
             current = self.players[turn % 2]
             result = selector(self.board, current, round_number)
-            executed_actions.append((current.name, result))
+            if record == "full":
+                executed_actions.append((current.name, result))
+            elif record == "compact":
+                executed_actions.append(CompactAction.from_result(current.name, result))
             if not self.board.piles:
-                current.tabbe += 1
+                current.record_tabbe()
             turn += 1
 
         scores = score_round(self.players)
@@ -147,34 +180,54 @@ class GameEngine:
         starter_idx: int = 0,
     ) -> SessionResult:
         cumulative = {p.name: 0 for p in self.players}
-        starting_player_idx = starter_idx
         omgangen: List[OmgangResult] = []
 
+        for round_result in self.iter_session(rounds, action_selector=action_selector, starter_idx=starter_idx):
+            if not omgangen or omgangen[-1].index != round_result.omgang_index:
+                omgangen.append(OmgangResult(index=round_result.omgang_index))
+            for s in round_result.scores:
+                cumulative[s.player.name] += s.total
+            omgangen[-1].rounds.append(round_result)
+
+        ai_values = getattr(self.ai, "values", None)
+        return SessionResult(omgangen=omgangen, cumulative=cumulative, ai_values=ai_values)
+
+    def iter_session(
+        self,
+        rounds: int,
+        action_selector: Optional[ActionSelector] = None,
+        starter_idx: int = 0,
+        record: str = "full",
+    ) -> Iterator[RoundResult]:
+        """Play ``rounds`` omgångar and yield each round as soon as it is scored.
+
+        Nothing is kept between rounds, so with ``record="compact"`` (card ids
+        only) or ``record="none"`` (no actions) long sessions run in constant
+        memory. Players still hold the round's cards while the result is being
+        consumed; they are reset when the generator resumes.
+        """
+        starting_player_idx = starter_idx
         for omg in range(rounds):
             self.start_omgang(omg)
-            omgang_result = OmgangResult(index=omg)
-
             for r in range(6):
                 self.deal_hands()
                 round_result = self.play_round(
                     r,
                     starter_idx=starting_player_idx,
                     action_selector=action_selector,
+                    record=record,
                 )
-                for s in round_result.scores:
-                    cumulative[s.player.name] += s.total
+                round_result.omgang_index = omg
+                yield round_result
                 # clear round data
                 for p in self.players:
-                    p.captured.clear()
-                    p.mulles.clear()
-                    p.tabbe = 0
-                omgang_result.rounds.append(round_result)
+                    p.reset_round()
             self.board.piles.clear()
             starting_player_idx = 1 - starting_player_idx
-            omgangen.append(omgang_result)
 
-        ai_values = getattr(self.ai, "values", None)
-        return SessionResult(omgangen=omgangen, cumulative=cumulative, ai_values=ai_values)
+    def state_hash(self) -> int:
+        """64-bit Zobrist hash of board, players and round, maintained incrementally."""
+        return state_hash(self.board, self.players, self.round_number)
 
     # convenience helpers for UIs
     def available_capture_combinations(self, card):
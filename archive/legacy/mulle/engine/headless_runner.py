@@ -2,9 +2,10 @@
 
 import argparse
 import json
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
 from .game_service import ActionSelector, GameEngine, SessionResult
 from ..models.board import Board
@@ -45,7 +46,7 @@ class ScriptedAction:
         if target_piles:
             target_set = frozenset(target_piles)
             for combo in combinations:
-                indices = frozenset(board.piles.index(p) for p in combo)
+                indices = frozenset(board.slot_of(p) for p in combo)
                 if indices == target_set:
                     return combo
         if self.combo_index is not None:
@@ -107,6 +108,95 @@ def run_headless_session(
     return engine.play_session(rounds=rounds, action_selector=selector)
 
 
+@dataclass
+class GameSummary:
+    """Outcome of one seeded session, small enough to ship back from a worker."""
+    seed: int
+    cumulative: Dict[str, int]
+    ai_values: Optional[Dict[str, float]] = None
+
+
+@dataclass
+class BatchResult:
+    games: int = 0
+    totals: Dict[str, int] = field(default_factory=dict)
+    wins: Dict[str, int] = field(default_factory=dict)
+    draws: int = 0
+    ai_value_sums: Dict[str, float] = field(default_factory=dict)
+    ai_games: int = 0
+
+    def add(self, game: GameSummary):
+        self.games += 1
+        for name, total in game.cumulative.items():
+            self.totals[name] = self.totals.get(name, 0) + total
+            self.wins.setdefault(name, 0)
+        best = max(game.cumulative.values())
+        leaders = [name for name, total in game.cumulative.items() if total == best]
+        if len(leaders) == 1:
+            self.wins[leaders[0]] += 1
+        else:
+            self.draws += 1
+        if game.ai_values is not None:
+            self.ai_games += 1
+            for category, value in game.ai_values.items():
+                self.ai_value_sums[category] = self.ai_value_sums.get(category, 0.0) + value
+
+    @property
+    def win_rates(self) -> Dict[str, float]:
+        return {name: won / self.games for name, won in self.wins.items()} if self.games else {}
+
+    @property
+    def ai_values(self) -> Dict[str, float]:
+        """Mean AI value per action category over all games."""
+        return {k: v / self.ai_games for k, v in self.ai_value_sums.items()} if self.ai_games else {}
+
+    def to_dict(self) -> dict:
+        return {
+            "games": self.games,
+            "totals": self.totals,
+            "wins": self.wins,
+            "draws": self.draws,
+            "win_rates": self.win_rates,
+            "ai_values": self.ai_values,
+        }
+
+
+# Per-process worker configuration, set once by the pool initializer
+_worker_rounds = 1
+
+
+def _init_worker(rounds: int):
+    global _worker_rounds
+    _worker_rounds = rounds
+
+
+def _play_game(seed: int, rounds: Optional[int] = None) -> GameSummary:
+    result = run_headless_session(rounds=_worker_rounds if rounds is None else rounds, seed=seed)
+    return GameSummary(seed=seed, cumulative=dict(result.cumulative), ai_values=result.ai_values)
+
+
+def iter_games(games: int, rounds: int = 1, seed: int = 42, workers: int = 1, chunksize: int = 8) -> Iterator[GameSummary]:
+    """Play ``games`` sessions with seeds ``seed, seed+1, ...`` and yield them in seed order.
+
+    Every game depends only on its own seed, and results are yielded in seed
+    order whatever the worker count, so aggregates are reproducible.
+    """
+    seeds = range(seed, seed + games)
+    if workers <= 1:
+        for s in seeds:
+            yield _play_game(s, rounds)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rounds,)) as pool:
+        yield from pool.map(_play_game, seeds, chunksize=max(1, chunksize))
+
+
+def run_parallel_sessions(games: int, rounds: int = 1, seed: int = 42, workers: int = 1) -> BatchResult:
+    batch = BatchResult()
+    for game in iter_games(games, rounds=rounds, seed=seed, workers=workers):
+        batch.add(game)
+    return batch
+
+
 def main(argv: Optional[List[str]] = None):
     parser = argparse.ArgumentParser(description="Kör Mulle-motorn utan UI")
     parser.add_argument("--seed", type=int, default=42)
@@ -116,8 +206,17 @@ def main(argv: Optional[List[str]] = None):
         type=Path,
         help="Valfritt JSON-script med drag (lista med objekt: player, action, card_index, target_piles, declared_value, combo_index)",
     )
+    parser.add_argument("--games", type=int, help="Spela många partier (seed, seed+1, ...) och summera")
+    parser.add_argument("--workers", type=int, default=1, help="Antal processer för --games")
     args = parser.parse_args(argv)
 
+    if args.games is not None:
+        if args.script:
+            parser.error("--script kan inte kombineras med --games")
+        batch = run_parallel_sessions(args.games, rounds=args.rounds, seed=args.seed, workers=args.workers)
+        print(json.dumps(batch.to_dict(), ensure_ascii=False))
+        return
+
     actions = load_script(args.script) if args.script else None
     result = run_headless_session(rounds=args.rounds, seed=args.seed, scripted_actions=actions)
     print(json.dumps({"cumulative": result.cumulative, "rounds": len(result.omgangen)}, ensure_ascii=False))
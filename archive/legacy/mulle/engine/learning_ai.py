@@ -13,8 +13,10 @@ class SimpleLearningAI:
     a list of candidate action objects with attributes: category (str), predicted_reward (float), and an execute() method.
     """
 
-    def __init__(self, player: Player):
+    def __init__(self, player: Player, rng: Optional[random.Random] = None):
         self.player = player
+        # Exploration stream; the engine reseeds it per omgång
+        self.rng = rng if rng is not None else random.Random()
         self.values = {
             'capture_combo_mulle': 10.0,
             'capture_combo': 5.0,
@@ -28,8 +30,8 @@ class SimpleLearningAI:
         candidates = enumerate_candidate_actions(board, self.player, round_number)
         if not candidates:
             return None
-        if random.random() < self.exploration:
-            return random.choice(candidates)
+        if self.rng.random() < self.exploration:
+            return self.rng.choice(candidates)
         scored = []
         for c in candidates:
             # Skip malformed candidate actions
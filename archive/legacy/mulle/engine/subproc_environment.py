@@ -0,0 +1,212 @@
+"""Vectorized training environment spread over worker processes.
+
+Each worker runs a :class:`VecTrainingEnvironment` for a contiguous slice of
+the games and writes features, action masks, rewards and done flags straight
+into one ``multiprocessing.shared_memory`` block. Only small commands (action
+indices) and the final scores of finished games travel over the pipes, so no
+``Board``/``Card`` objects are pickled while stepping. The parent copies the
+block out once per call, so callers never hold views into shared memory.
+
+Shared block layout for ``n`` games: ``n`` float64 rewards, the
+``ObservationBuffer`` features and masks, then ``n`` done bytes.
+"""
+
+import multiprocessing
+import traceback
+import weakref
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+from .encoding import ACTION_COUNT, OBS_SIZE, ObservationBuffer
+from .training_environment import VecTrainingEnvironment
+
+
+def _views(buf, num_envs: int) -> Tuple[memoryview, memoryview, memoryview, memoryview]:
+    """(rewards, features, masks, dones) views over a shared block."""
+    rewards_end = 8 * num_envs
+    features_end = rewards_end + 4 * OBS_SIZE * num_envs
+    masks_end = features_end + ACTION_COUNT * num_envs
+    return (
+        buf[:rewards_end].cast("d"),
+        buf[rewards_end:features_end].cast("f"),
+        buf[features_end:masks_end].cast("B"),
+        buf[masks_end:masks_end + num_envs].cast("B"),
+    )
+
+
+def _block_size(num_envs: int) -> int:
+    return num_envs * (8 + 4 * OBS_SIZE + ACTION_COUNT + 1)
+
+
+def _run_command(vec: VecTrainingEnvironment, rewards, dones, start: int, command: str, payload) -> Any:
+    """Handle one command for games ``start:start + vec.num_envs``; returns the reply payload."""
+    stop = start + vec.num_envs
+    if command == "reset":
+        vec.reset()
+        rewards[start:stop] = memoryview(bytes(8 * vec.num_envs)).cast("d")
+        dones[start:stop] = bytes(vec.num_envs)
+        return None
+    if command == "step":
+        _, step_rewards, step_dones, infos = vec.step(payload)
+        scores = {}
+        for i, (reward, done, info) in enumerate(zip(step_rewards, step_dones, infos)):
+            rewards[start + i] = reward
+            dones[start + i] = done
+            if done:
+                scores[start + i] = info["scores"]
+        return scores
+    raise ValueError(f"Okänt kommando: {command}")
+
+
+def _worker(conn, shm_name: str, num_envs: int, start: int, stop: int, seed: int):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    rewards, features, masks, dones = _views(shm.buf, num_envs)
+    buffer = ObservationBuffer(
+        stop - start,
+        features=features[start * OBS_SIZE:stop * OBS_SIZE],
+        masks=masks[start * ACTION_COUNT:stop * ACTION_COUNT],
+    )
+    vec = VecTrainingEnvironment(stop - start, seed=seed + start, legal_actions=False, buffer=buffer)
+    try:
+        while True:
+            try:
+                command, payload = conn.recv()
+            except EOFError:
+                break  # the parent went away without closing
+            if command == "close":
+                break
+            try:
+                conn.send(("ok", _run_command(vec, rewards, dones, start, command, payload)))
+            except Exception:
+                conn.send(("error", traceback.format_exc()))
+    finally:
+        # The views must be gone before the block can be detached
+        del buffer, vec, rewards, features, masks, dones
+        shm.close()
+        conn.close()
+
+
+def _release(shm: shared_memory.SharedMemory, views: List[memoryview], conns: list, procs: list):
+    """Stop the workers and free the shared block (also run if ``close`` never is)."""
+    for conn in conns:
+        try:
+            conn.send(("close", None))
+        except OSError:
+            pass  # the worker is gone already
+        conn.close()
+    for proc in procs:
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+            proc.join()
+    for view in views:
+        view.release()
+    shm.close()
+    shm.unlink()
+
+
+class SubprocVecTrainingEnvironment:
+    """``num_envs`` training games stepped in lockstep by ``workers`` processes.
+
+    Game ``i`` is the same game as in ``VecTrainingEnvironment(num_envs, seed)``.
+    Actions are indices into the encoding's action space (or ``None`` for the
+    default choice). ``reset`` and ``step`` return a fresh
+    :class:`ObservationBuffer` and lists copied out of shared memory, so they
+    stay valid after later calls and after ``close``. Finished games are reset
+    on their next deal as in :class:`VecTrainingEnvironment`.
+
+    If a worker fails, the other workers may already have stepped, so the
+    vector refuses to step again until ``reset``. The shared block is freed by
+    ``close`` or, failing that, when the environment is garbage collected.
+    """
+
+    def __init__(self, num_envs: int, seed: int = 42, workers: int = 2):
+        if num_envs < 1:
+            raise ValueError("num_envs måste vara minst 1")
+        workers = max(1, min(workers, num_envs))
+        self.num_envs = num_envs
+        shm = shared_memory.SharedMemory(create=True, size=_block_size(num_envs))
+        self._shm_name = shm.name
+        self._views = list(_views(shm.buf, num_envs))
+
+        # Contiguous slices of games, as even as possible
+        size, extra = divmod(num_envs, workers)
+        self._slices: List[Tuple[int, int]] = []
+        start = 0
+        for w in range(workers):
+            stop = start + size + (w < extra)
+            self._slices.append((start, stop))
+            start = stop
+
+        self._conns = []
+        self._procs = []
+        self._finalizer = weakref.finalize(self, _release, shm, self._views, self._conns, self._procs)
+        for start, stop in self._slices:
+            parent, child = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_worker, args=(child, shm.name, num_envs, start, stop, seed), daemon=True
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        self._failed = False
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def _broadcast(self, commands: List[Tuple[str, Any]]) -> List[Any]:
+        if self.closed:
+            raise RuntimeError("Miljön är stängd")
+        for conn, command in zip(self._conns, commands):
+            conn.send(command)
+        replies = [conn.recv() for conn in self._conns]
+        for status, payload in replies:
+            if status == "error":
+                self._failed = True
+                raise RuntimeError(f"Fel i arbetsprocess:\n{payload}")
+        return [payload for _, payload in replies]
+
+    def _copy_buffer(self) -> ObservationBuffer:
+        _, features, masks, _ = self._views
+        buffer = ObservationBuffer(self.num_envs)
+        memoryview(buffer.features)[:] = features
+        memoryview(buffer.masks)[:] = masks
+        return buffer
+
+    def reset(self) -> ObservationBuffer:
+        """Restart every game from its first deal; returns a copy of the observations."""
+        self._broadcast([("reset", None)] * len(self._conns))
+        self._failed = False
+        return self._copy_buffer()
+
+    def step(
+        self, actions: Optional[List[Optional[int]]] = None
+    ) -> Tuple[ObservationBuffer, List[float], List[bool], List[Dict[str, Any]]]:
+        """Play one turn in every game; returns ``(buffer, rewards, dones, infos)``.
+
+        ``infos[i]`` holds the final ``scores`` when game ``i`` finished.
+        """
+        if actions is None:
+            actions = [None] * self.num_envs
+        elif len(actions) != self.num_envs:
+            raise ValueError(f"Förväntade {self.num_envs} drag, fick {len(actions)}")
+        if self._failed:
+            raise RuntimeError("Ett tidigare fel lämnade spelen i otakt: anropa reset()")
+        replies = self._broadcast([("step", list(actions[start:stop])) for start, stop in self._slices])
+        infos: List[Dict[str, Any]] = [{} for _ in range(self.num_envs)]
+        for scores in replies:
+            for index, game_scores in scores.items():
+                infos[index]["scores"] = game_scores
+        rewards, _, _, dones = self._views
+        return self._copy_buffer(), list(rewards), [bool(d) for d in dones], infos
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self) -> "SubprocVecTrainingEnvironment":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,29 +1,73 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import argparse
 
 from ..models.board import Board
+from ..models.snapshot import BoardSnapshot
 from ..models.card import Card
+from ..models.move import Move
 from ..models.player import Player
 from ..rules.capture import (
     ActionResult,
     CandidateAction,
+    TurnContext,
     auto_play_turn,
     enumerate_candidate_actions,
+    legal_moves,
 )
 from ..rules.scoring import score_round
+from .encoding import ObservationBuffer, action_table, encode_action_mask, encode_observation
 from .game_service import GameEngine
 
+# A candidate action, an index into the encoding's action space, or None for the default
+Action = Union[CandidateAction, int, None]
 
-@dataclass
+
+@dataclass(init=False)
 class TrainingObservation:
-    """A compact snapshot of the game state for learning purposes."""
+    """A compact snapshot of the game state for learning purposes.
+
+    ``board`` and ``hand`` are immutable, so observations kept in a replay
+    buffer stay valid while the game goes on. ``legal_actions`` may be given as
+    a list or as a loader called on first access; the environment passes a
+    loader, which computes the actions from the snapshot once the game has
+    moved on (they then describe the observed position without being playable
+    in the environment).
+    """
 
-    board: Board
-    hand: List[Card]
+    board: BoardSnapshot
+    hand: Tuple[Card, ...]
     opponent_cards: int
     round_number: int
-    legal_actions: List[CandidateAction] = field(default_factory=list)
+    # The legal actions, or a loader that computes them once
+    _legal: Union[List[CandidateAction], Callable[[], List[CandidateAction]]] = field(repr=False)
+    # Encoded rows (see mulle.engine.encoding) when the environment writes them
+    features: Optional[memoryview] = None
+    action_mask: Optional[memoryview] = None
+
+    def __init__(
+        self,
+        board: BoardSnapshot,
+        hand: Tuple[Card, ...],
+        opponent_cards: int,
+        round_number: int,
+        legal_actions: Union[List[CandidateAction], Callable[[], List[CandidateAction]], None] = None,
+        features: Optional[memoryview] = None,
+        action_mask: Optional[memoryview] = None,
+    ):
+        self.board = board
+        self.hand = hand
+        self.opponent_cards = opponent_cards
+        self.round_number = round_number
+        self._legal = [] if legal_actions is None else legal_actions
+        self.features = features
+        self.action_mask = action_mask
+
+    @property
+    def legal_actions(self) -> List[CandidateAction]:
+        if callable(self._legal):
+            self._legal = self._legal()
+        return self._legal
 
 
 class TrainingEnvironment:
@@ -33,12 +77,23 @@ class TrainingEnvironment:
     but keeps the game-flow logic from :class:`GameEngine`. The controlled player
     is always the first one ("Anna") while the opponent uses the built-in
     heuristic ``auto_play_turn``.
+
+    Legal moves are only generated when something asks for them, once per
+    position; ``legal_actions`` and ``action_table`` are both derived from
+    them. With ``legal_actions=False`` observations carry none at all, for
+    policies that pick action indices from the encoded mask.
     """
 
-    def __init__(self, seed: int = 42):
+    def __init__(self, seed: int = 42, legal_actions: bool = True):
         self.engine = GameEngine(seed=seed, ai_enabled=False)
         self.round_number = 1
         self.done = False
+        self.with_legal_actions = legal_actions
+        self._games = 0  # resets so far; a new deal can repeat an old position key
+        # (state key, value) caches for the current position
+        self._moves: Optional[Tuple[tuple, TurnContext, List[Move]]] = None
+        self._actions: Optional[Tuple[tuple, List[CandidateAction]]] = None
+        self._table: Optional[Tuple[tuple, Dict[int, Move]]] = None
 
     def start(self) -> TrainingObservation:
         """Alias for :meth:`reset` to make CLI usage more readable."""
@@ -46,11 +101,16 @@ class TrainingEnvironment:
         return self.reset()
 
     # --- public API ---
-    def reset(self) -> TrainingObservation:
-        """Start a new single-round training session and return the first observation."""
+    def reset(self, omgang_index: int = 0) -> TrainingObservation:
+        """Start a new single-round training session and return the first observation.
+
+        ``omgang_index`` picks the deal (each index has its own shuffle for the
+        environment's seed), so repeated resets can cover different games.
+        """
 
-        self.engine.start_omgang(0)
+        self.engine.start_omgang(omgang_index)
         self.engine.deal_hands()
+        self._games += 1
         self.round_number = 1
         self.done = False
         return self._build_observation()
@@ -60,17 +120,43 @@ class TrainingEnvironment:
 
         if self.done:
             return []
-        player = self.engine.players[0]
-        return enumerate_candidate_actions(self.engine.board, player, self.round_number)
+        key = self._state_key()
+        if self._actions is None or self._actions[0] != key:
+            ctx, moves = self._legal_moves()
+            # The policy only needs one fallback discard, as in candidate_moves
+            first = next((i for i, m in enumerate(moves) if m.kind == "discard"), None)
+            if first is not None:
+                moves = moves[:first + 1]
+            board, player = self.engine.board, self.engine.players[0]
+            self._actions = (key, [CandidateAction(m, board, player, self.round_number, ctx) for m in moves])
+        return self._actions[1]
+
+    def action_table(self) -> Dict[int, Move]:
+        """Legal moves of the controlled player keyed by action index."""
+
+        if self.done:
+            return {}
+        key = self._state_key()
+        if self._table is None or self._table[0] != key:
+            ctx, moves = self._legal_moves()
+            self._table = (key, action_table(self.engine.board, self.engine.players[0], ctx, moves))
+        return self._table[1]
+
+    def encode(self, buffer: ObservationBuffer, row: int = 0):
+        """Write the controlled player's features and action mask into ``buffer``."""
+
+        player, opponent = self.engine.players
+        encode_observation(self.engine.board, player, opponent, self.round_number, buffer.features, row)
+        encode_action_mask(self.action_table(), buffer.masks, row)
 
     def step(
-        self, action: Optional[CandidateAction] = None
+        self, action: Action = None
     ) -> Tuple[TrainingObservation, float, bool, Dict[str, Any]]:
         """Play one turn for the controlled player and advance the environment.
 
         The optional ``action`` should be a ``CandidateAction`` from
-        :meth:`legal_actions`. If omitted, the highest-predicted-reward action is
-        chosen automatically. The opponent immediately plays one response turn via
+        :meth:`legal_actions` or a legal index from :meth:`action_table`. If
+        omitted, the highest-predicted-reward action is chosen automatically. The opponent immediately plays one response turn via
         ``auto_play_turn``. Returns ``(observation, reward, done, info)``.
         """
 
@@ -80,17 +166,24 @@ class TrainingEnvironment:
         player = self.engine.players[0]
         opponent = self.engine.players[1]
 
+        if isinstance(action, int):
+            move = self.action_table().get(action)
+            if move is None:
+                raise ValueError(f"Otillåtet drag: {action}")
+            action = CandidateAction(move, self.engine.board, player, self.round_number)
+        elif isinstance(action, CandidateAction) and not action.plays_on(self.engine.board, player):
+            raise ValueError("Draget hör till en annan ställning än spelets")
         chosen_action = action or self._select_default_action()
         player_result = self._apply_action(player, chosen_action)
         if not self.engine.board.piles:
-            player.tabbe += 1
+            player.record_tabbe()
         reward = self._reward_from_result(player_result)
 
         opponent_result: Optional[ActionResult] = None
         if opponent.hand:
             opponent_result = auto_play_turn(self.engine.board, opponent, self.round_number)
             if not self.engine.board.piles:
-                opponent.tabbe += 1
+                opponent.record_tabbe()
 
         self.done = not any(p.hand for p in self.engine.players)
 
@@ -106,6 +199,35 @@ class TrainingEnvironment:
         return observation, reward, self.done, info
 
     # --- helpers ---
+    def _state_key(self) -> tuple:
+        board = self.engine.board
+        return (self._games, board.version, board.zhash, self.engine.players[0].zhash)
+
+    def _legal_moves(self) -> Tuple[TurnContext, List[Move]]:
+        """The turn context and every legal move of the current position, generated once."""
+        key = self._state_key()
+        if self._moves is None or self._moves[0] != key:
+            board, player = self.engine.board, self.engine.players[0]
+            ctx = TurnContext(board, player)
+            self._moves = (key, ctx, legal_moves(board, player, ctx=ctx))
+        return self._moves[1], self._moves[2]
+
+    def _legal_loader(self, snapshot: BoardSnapshot, hand: Tuple[Card, ...]) -> Callable[[], List[CandidateAction]]:
+        key = self._state_key()
+        name = self.engine.players[0].name
+        round_number = self.round_number
+
+        def load() -> List[CandidateAction]:
+            if self._state_key() == key:
+                return self.legal_actions()
+            # The game has moved on: rebuild the observed position from the snapshot
+            board = Board.from_snapshot(snapshot)
+            player = Player(name)
+            player.add_to_hand(list(hand))
+            return enumerate_candidate_actions(board, player, round_number)
+
+        return load
+
     def _select_default_action(self) -> Optional[CandidateAction]:
         actions = self.legal_actions()
         if not actions:
@@ -129,16 +251,94 @@ class TrainingEnvironment:
         return float(captured_len + 1 + 5 * mulle_pairs_len + (2 if build_created else 0))
 
     def _build_observation(self) -> TrainingObservation:
-        player = self.engine.players[0]
+        snapshot = self.engine.board.snapshot()
+        hand = tuple(self.engine.players[0].hand)
         return TrainingObservation(
-            board=self.engine.board,
-            hand=list(player.hand),
+            board=snapshot,
+            hand=hand,
             opponent_cards=len(self.engine.players[1].hand),
             round_number=self.round_number,
-            legal_actions=self.legal_actions(),
+            legal_actions=self._legal_loader(snapshot, hand) if self.with_legal_actions and not self.done else [],
         )
 
 
+class VecTrainingEnvironment:
+    """``num_envs`` independent :class:`TrainingEnvironment` games stepped in lockstep.
+
+    Game ``i`` uses seed ``seed + i``. ``step`` takes one action per game and
+    returns batched ``(observations, rewards, dones, infos)``. A game that
+    finishes is reset right away on its next deal, so the returned observation
+    for it already belongs to the new game; the last observation of the finished
+    one is in ``infos[i]["final_observation"]``.
+
+    Each returned observation also carries its game's row of ``buffer`` (features
+    and action mask, see :mod:`mulle.engine.encoding`), so the batch is
+    available as two contiguous arrays. The rows are rewritten on every call.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        seed: int = 42,
+        legal_actions: bool = True,
+        buffer: Optional[ObservationBuffer] = None,
+    ):
+        if num_envs < 1:
+            raise ValueError("num_envs måste vara minst 1")
+        self.envs = [TrainingEnvironment(seed=seed + i, legal_actions=legal_actions) for i in range(num_envs)]
+        self.episodes = [0] * num_envs  # games finished per slot, selects the next deal
+        self.buffer = buffer if buffer is not None else ObservationBuffer(num_envs)
+        if self.buffer.rows != num_envs:
+            raise ValueError("Bufferten måste ha en rad per spel")
+
+    @property
+    def num_envs(self) -> int:
+        return len(self.envs)
+
+    def reset(self) -> List[TrainingObservation]:
+        """Restart every game from its first deal."""
+
+        self.episodes = [0] * self.num_envs
+        return [self._encoded(i, env.reset()) for i, env in enumerate(self.envs)]
+
+    def step(
+        self, actions: Optional[List[Action]] = None
+    ) -> Tuple[List[TrainingObservation], List[float], List[bool], List[Dict[str, Any]]]:
+        """Play one turn in every game.
+
+        ``actions[i]`` is a candidate or action index from game ``i``'s current
+        observation, or ``None`` for the default choice; omitting ``actions``
+        uses the default everywhere.
+        """
+
+        if actions is None:
+            actions = [None] * self.num_envs
+        elif len(actions) != self.num_envs:
+            raise ValueError(f"Förväntade {self.num_envs} drag, fick {len(actions)}")
+
+        observations: List[TrainingObservation] = []
+        rewards: List[float] = []
+        dones: List[bool] = []
+        infos: List[Dict[str, Any]] = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs, reward, done, info = env.step(action)
+            if done:
+                info["final_observation"] = obs
+                self.episodes[i] += 1
+                obs = env.reset(self.episodes[i])
+            observations.append(self._encoded(i, obs))
+            rewards.append(reward)
+            dones.append(done)
+            infos.append(info)
+        return observations, rewards, dones, infos
+
+    def _encoded(self, row: int, obs: TrainingObservation) -> TrainingObservation:
+        self.envs[row].encode(self.buffer, row)
+        obs.features = self.buffer.feature_row(row)
+        obs.action_mask = self.buffer.mask_row(row)
+        return obs
+
+
 def _format_action(action: Optional[CandidateAction]) -> str:
     if action is None:
         return "AUTO"
@@ -1,15 +1,456 @@
-from typing import List, Union
+import bisect
+from typing import Dict, Iterable, List, Tuple, Union
 from .card import Card
 from .build import Build
+from .packing import select_groups, subset_sum_mask
+from .snapshot import BoardSnapshot, FrozenPile, freeze_pile
+from .zobrist import BUILD_KEY, LOCKED_KEY, PLAIN_PILE_KEY, TARGET_KEYS, cards_key, mix64, owner_key
 
 Pile = Union[List[Card], Build]
 
+
+class CardPile(list):
+    """Plain pile of cards (single card or combination) with a stable board handle.
+
+    Behaves exactly like a list of cards; ``uid`` is assigned by the board the
+    pile is placed on and survives copies, so piles with equal cards stay
+    distinguishable.
+    """
+
+    __slots__ = ("uid",)
+
+    def __init__(self, cards: Iterable[Card] = (), uid: int | None = None):
+        super().__init__(cards)
+        self.uid = uid
+
+
+def _insert_ordered(bucket: list, pile: Pile, order: Dict[int, int]):
+    """Insert ``pile`` into ``bucket`` keeping it in board order."""
+    if not bucket or order[bucket[-1].uid] < order[pile.uid]:
+        bucket.append(pile)
+    else:
+        bisect.insort(bucket, pile, key=lambda p: order[p.uid])
+
+
+def _remove_identical(bucket: list, pile: Pile):
+    for i, p in enumerate(bucket):
+        if p is pile:
+            del bucket[i]
+            return
+
+
+def _bucket_insert(index: dict, key, pile: Pile, order: Dict[int, int]):
+    _insert_ordered(index.setdefault(key, []), pile, order)
+
+
+def _bucket_remove(index: dict, key, pile: Pile):
+    bucket = index[key]
+    _remove_identical(bucket, pile)
+    if not bucket:
+        del index[key]
+
+
+def pile_value(pile: Pile) -> int:
+    if isinstance(pile, Build):
+        return pile.value
+    return sum(c.value_on_board() for c in pile)
+
+
+def pile_cards(pile: Pile) -> List[Card]:
+    return pile.cards if isinstance(pile, Build) else pile
+
+
+def cards_mask(cards: Iterable[Card]) -> int:
+    mask = 0
+    for c in cards:
+        mask |= 1 << c.id
+    return mask
+
+
+def pile_hash(pile: Pile) -> int:
+    """Zobrist hash of one pile: its cards plus, for builds, owner, lock and target."""
+    if isinstance(pile, Build):
+        key = cards_key(pile.cards) ^ BUILD_KEY ^ owner_key(pile.owner) ^ TARGET_KEYS[pile.target_value & 31]
+        if pile.locked:
+            key ^= LOCKED_KEY
+        return mix64(key)
+    return mix64(cards_key(pile) ^ PLAIN_PILE_KEY)
+
+
+class PileList(list):
+    """List of board piles that keeps its board's indexes in step with every change.
+
+    ``append``/``extend``/``remove``/``pop`` update the indexes incrementally;
+    anything that reorders or replaces piles in bulk triggers a full reindex.
+    Plain card lists are wrapped in :class:`CardPile` when they are added.
+    """
+
+    __slots__ = ("_board",)
+
+    def __init__(self, board: "Board", piles=()):
+        super().__init__(piles)
+        self._board = board
+
+    def append(self, pile: Pile):
+        board = self._board
+        pile = board._adopt(pile)
+        super().append(pile)
+        board._pile_added(pile, len(self) - 1)
+        if board._undo_log is not None:
+            board._undo_log.record(board._unappend_pile, pile)
+
+    def extend(self, piles):
+        for pile in piles:
+            self.append(pile)
+
+    def remove(self, pile: Pile):
+        self.pop(self._board.slot_of(pile))
+
+    def pop(self, index: int = -1) -> Pile:
+        board = self._board
+        if index < 0:
+            index += len(self)
+        pile = super().pop(index)
+        order = board._pile_removed(pile, index)
+        if board._undo_log is not None:
+            board._undo_log.record(board._restore_piles, [(index, pile, order)])
+        return pile
+
+    def __reduce_ex__(self, protocol):
+        # Copies and pickles are plain lists, detached from the board
+        return (list, (list(self),))
+
+
+def _reindexing(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        board = self._board
+        if board._undo_log is not None:
+            board._undo_log.record(board._reset_piles, list(self), dict(board._order))
+        result = method(self, *args, **kwargs)
+        board._reindex()
+        return result
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ("insert", "clear", "sort", "reverse", "__setitem__", "__delitem__", "__iadd__", "__imul__"):
+    setattr(PileList, _name, _reindexing(_name))
+
+
 class Board:
     def __init__(self):
-        self.piles: List[Pile] = []  # each pile: list of cards (len>=1) or Build
+        self._version = 0
+        self._next_uid = 1
+        self._signature: Tuple[int, ...] | None = None
+        self._reachable: int | None = None
+        self._snapshot: Tuple[Tuple[int, int], BoardSnapshot] | None = None  # ((version, zhash), snapshot)
+        self._frozen: Dict[int, Tuple[int, FrozenPile]] = {}
+        # UndoLog recording inverse operations while a move search is active
+        self._undo_log = None
+        self.piles = []  # each pile: CardPile of cards (len>=1) or Build
+
+    @property
+    def piles(self) -> List[Pile]:
+        return self._piles
+
+    @piles.setter
+    def piles(self, piles: List[Pile]):
+        if self._undo_log is not None:
+            self._undo_log.record(self._reset_piles, list(self._piles), dict(self._order))
+        self._piles = PileList(self, piles)
+        self._reindex()
+
+    def __getstate__(self):
+        return {"piles": list(self._piles), "next_uid": self._next_uid}
+
+    def __setstate__(self, state):
+        # Indexes are rebuilt after copying; pile uids travel with the piles
+        self._version = 0
+        self._next_uid = state["next_uid"]
+        self._signature = None
+        self._reachable = None
+        self._snapshot = None
+        self._frozen = {}
+        self._undo_log = None
+        self.piles = state["piles"]
+
+    # --- index maintenance ---
+    # Piles are indexed by uid. Every pile also has an order key that grows with
+    # board position, which keeps the buckets in board order even when an undo
+    # puts a pile back in the middle.
+    def _adopt(self, pile: Pile) -> Pile:
+        if not isinstance(pile, (CardPile, Build)):
+            pile = CardPile(pile)
+        if pile.uid is None or self._by_uid.get(pile.uid, pile) is not pile:
+            pile.uid = self._next_uid
+        # Never hand out a uid that is already in use on this board
+        self._next_uid = max(self._next_uid, pile.uid + 1)
+        return pile
+
+    def _reindex(self, order: Dict[int, int] | None = None):
+        self._by_uid: Dict[int, Pile] = {}
+        self._slots: Dict[int, int] = {}
+        self._order: Dict[int, int] = {}
+        self._next_order = 0
+        self._values: Dict[int, int] = {}
+        self._piles_by_value: Dict[int, List[Pile]] = {}
+        self._builds: List[Build] = []
+        self._builds_by_value: Dict[int, List[Build]] = {}
+        self._builds_by_owner: Dict[str, List[Build]] = {}
+        self._single_counts: List[int] = [0] * 14  # board values 1..13
+        self._hashes: Dict[int, int] = {}
+        self._zhash = 0
+        # Card locations: ids of all board cards, and card id -> pile uid
+        # (assumes every card is on the board at most once, as with a real deck)
+        self._card_mask = 0
+        self._pile_masks: Dict[int, int] = {}
+        self._card_piles: Dict[int, int] = {}
+        for index, pile in enumerate(self._piles):
+            adopted = self._adopt(pile)
+            if adopted is not pile:
+                list.__setitem__(self._piles, index, adopted)
+            self._pile_added(adopted, index, order[adopted.uid] if order else None, touch=False)
+        self._slots_valid = True
+        self._touch()
+
+    def _pile_added(self, pile: Pile, slot: int, order: int | None = None, touch: bool = True):
+        uid = pile.uid
+        if order is None:
+            order = self._next_order
+        self._next_order = max(self._next_order, order + 1)
+        value = pile_value(pile)
+        self._by_uid[uid] = pile
+        self._slots[uid] = slot
+        self._order[uid] = order
+        self._values[uid] = value
+        h = self._hashes[uid] = pile_hash(pile)
+        self._zhash ^= h
+        self._set_pile_cards(uid, cards_mask(pile_cards(pile)))
+        _bucket_insert(self._piles_by_value, value, pile, self._order)
+        if isinstance(pile, Build):
+            _insert_ordered(self._builds, pile, self._order)
+            _bucket_insert(self._builds_by_value, value, pile, self._order)
+            _bucket_insert(self._builds_by_owner, pile.owner, pile, self._order)
+        elif len(pile) == 1:
+            self._single_counts[value] += 1
+        if touch:
+            self._touch()
+
+    def _pile_removed(self, pile: Pile, slot: int, touch: bool = True) -> int:
+        """Drop ``pile`` from the indexes and return its order key."""
+        uid = pile.uid
+        del self._by_uid[uid]
+        del self._slots[uid]
+        value = self._values.pop(uid)
+        self._zhash ^= self._hashes.pop(uid)
+        self._set_pile_cards(uid, 0)
+        _bucket_remove(self._piles_by_value, value, pile)
+        if isinstance(pile, Build):
+            _remove_identical(self._builds, pile)
+            _bucket_remove(self._builds_by_value, value, pile)
+            _bucket_remove(self._builds_by_owner, pile.owner, pile)
+        elif len(pile) == 1:
+            self._single_counts[value] -= 1
+        # Later piles shifted down one slot; renumber lazily on the next lookup
+        if slot != len(self._piles):
+            self._slots_valid = False
+        if touch:
+            self._touch()
+        return self._order.pop(uid)
+
+    # --- undo support (inverse operations, never journaled themselves) ---
+    def _unappend_pile(self, pile: Pile):
+        removed = list.pop(self._piles)
+        assert removed is pile, "undo log out of sync with board"
+        self._pile_removed(pile, len(self._piles))
+
+    def _restore_piles(self, entries: List[Tuple[int, Pile, int]]):
+        """Put removed piles back at their old slots (entries sorted by slot)."""
+        for slot, pile, order in entries:
+            list.insert(self._piles, slot, pile)
+            self._pile_added(pile, slot, order, touch=False)
+            if slot != len(self._piles) - 1:
+                self._slots_valid = False
+        self._touch()
+
+    def _reset_piles(self, piles: List[Pile], order: Dict[int, int]):
+        self._piles = PileList(self, piles)
+        self._reindex(order)
+
+    def _restore_build(self, build: Build, card_count: int, locked: bool):
+        del build.cards[card_count:]
+        build.locked = locked
+        self._rehash_build(build)
+
+    def _record_build(self, build: Build):
+        if self._undo_log is not None:
+            self._undo_log.record(self._restore_build, build, len(build.cards), build.locked)
+
+    def _rehash_build(self, build: Build):
+        """Refresh the hash of a build whose cards or lock changed in place."""
+        if not self.has_pile(build):
+            return
+        h = pile_hash(build)
+        self._zhash ^= self._hashes[build.uid] ^ h
+        self._hashes[build.uid] = h
+        self._set_pile_cards(build.uid, cards_mask(build.cards))
+
+    def _set_pile_cards(self, uid: int, mask: int):
+        """Point the card location index at the cards now in pile ``uid``."""
+        old = self._pile_masks.pop(uid, 0)
+        if mask:
+            self._pile_masks[uid] = mask
+        changed = old ^ mask
+        self._card_mask ^= changed
+        while changed:
+            low = changed & -changed
+            cid = low.bit_length() - 1
+            if mask & low:
+                self._card_piles[cid] = uid
+            elif self._card_piles.get(cid) == uid:
+                del self._card_piles[cid]
+            changed ^= low
+
+    def _touch(self):
+        self._version += 1
+        self._signature = None
+        self._reachable = None
+
+    @property
+    def version(self) -> int:
+        """Counter bumped on every change to ``piles``."""
+        return self._version
+
+    @property
+    def zhash(self) -> int:
+        """Zobrist hash of the piles, kept up to date incrementally.
+
+        Piles hash independently of their board position. Builds changed in
+        place must go through the board (``feed_build``/``create_build``).
+        """
+        return self._zhash
+
+    def compute_zhash(self) -> int:
+        """Recompute ``zhash`` from scratch (for verification)."""
+        h = 0
+        for pile in self._piles:
+            h ^= pile_hash(pile)
+        return h
+
+    def value_signature(self) -> Tuple[int, ...]:
+        """Pile values in board order, cached until ``piles`` changes."""
+        if self._signature is None:
+            values = self._values
+            self._signature = tuple(values[p.uid] for p in self._piles)
+        return self._signature
+
+    def reachable_sums(self) -> int:
+        """Bit mask of the values 1..16 some set of piles adds up to, cached until ``piles`` changes."""
+        if self._reachable is None:
+            self._reachable = subset_sum_mask(self._values.values())
+        return self._reachable
+
+    def can_reach(self, value: int) -> bool:
+        return bool(self.reachable_sums() >> value & 1)
+
+    # --- snapshots ---
+    def snapshot(self) -> BoardSnapshot:
+        """Immutable copy of the current piles, sharing unchanged piles with earlier snapshots."""
+        key = (self._version, self._zhash)
+        if self._snapshot is not None and self._snapshot[0] == key:
+            return self._snapshot[1]
+        old = self._frozen
+        frozen: Dict[int, Tuple[int, FrozenPile]] = {}
+        piles = []
+        for pile in self._piles:
+            uid = pile.uid
+            h = self._hashes[uid]
+            entry = old.get(uid)
+            if entry is None or entry[0] != h:
+                entry = (h, freeze_pile(pile, uid, self._values[uid]))
+            frozen[uid] = entry
+            piles.append(entry[1])
+        self._frozen = frozen
+        snap = BoardSnapshot(tuple(piles), self._zhash, self._card_mask)
+        self._snapshot = (key, snap)
+        return snap
+
+    @classmethod
+    def from_snapshot(cls, snap: BoardSnapshot) -> "Board":
+        """A live board with the snapshot's piles (and pile handles)."""
+        board = cls()
+        piles = []
+        for p in snap.piles:
+            if p.is_build:
+                pile = Build(list(p.cards), owner=p.owner, target_value=p.value, locked=p.locked, created_round=p.created_round)
+                pile.uid = p.uid
+            else:
+                pile = CardPile(p.cards, uid=p.uid)
+            piles.append(pile)
+        board.piles = piles
+        return board
+
+    # --- card locations ---
+    @property
+    def card_mask(self) -> int:
+        """Ids of all cards on the board as a bit mask (see ``CardSet``)."""
+        return self._card_mask
+
+    def has_card(self, card_id: int) -> bool:
+        return bool(self._card_mask >> card_id & 1)
+
+    def pile_holding(self, card_id: int) -> Pile | None:
+        """The pile (single, combination or build) that holds card ``card_id``."""
+        uid = self._card_piles.get(card_id)
+        return None if uid is None else self._by_uid[uid]
+
+    # --- pile handles ---
+    def get_pile(self, uid: int) -> Pile:
+        """Pile on the board with handle ``uid`` (KeyError if it is gone)."""
+        return self._by_uid[uid]
+
+    def has_pile(self, pile: Pile) -> bool:
+        uid = getattr(pile, "uid", None)
+        return uid is not None and self._by_uid.get(uid) is pile
+
+    def slot_of(self, pile: Pile) -> int:
+        """Index of ``pile`` in ``piles``.
+
+        Board piles are found by handle; a foreign list of equal cards falls
+        back to an equality scan, like ``list.index``.
+        """
+        if not self.has_pile(pile):
+            return list.index(self._piles, pile)
+        if not self._slots_valid:
+            self._slots = {p.uid: i for i, p in enumerate(self._piles)}
+            self._slots_valid = True
+        return self._slots[pile.uid]
+
+    # --- indexed queries ---
+    def pile_value(self, pile: Pile) -> int:
+        """Value of a pile on this board (cached), or computed for a foreign pile."""
+        if self.has_pile(pile):
+            return self._values[pile.uid]
+        return pile_value(pile)
+
+    def piles_with_value(self, value: int) -> List[Pile]:
+        return list(self._piles_by_value.get(value, ()))
+
+    def builds_of(self, owner: str) -> List[Build]:
+        return list(self._builds_by_owner.get(owner, ()))
+
+    def has_builds(self, owner: str) -> bool:
+        return bool(self._builds_by_owner.get(owner))
+
+    def single_value_counts(self) -> Tuple[int, ...]:
+        """Histogram of single-card pile values, indexed by board value 1..13."""
+        return tuple(self._single_counts)
 
     def add_card(self, card: Card):
-        self.piles.append([card])
+        self.piles.append(CardPile([card]))
 
     def add_pile(self, cards: List[Card]):
         self.piles.append(cards)
@@ -17,6 +458,23 @@ class Board:
     def remove_pile(self, pile: Pile):
         self.piles.remove(pile)
 
+    def remove_piles(self, piles: Iterable[Pile]):
+        """Remove several piles in a single compaction pass over ``piles``."""
+        drop = {self._piles[self.slot_of(p)].uid for p in piles}
+        kept = []
+        removed = []
+        for index, pile in enumerate(self._piles):
+            if pile.uid in drop:
+                removed.append((index, pile, self._pile_removed(pile, index, touch=False)))
+            else:
+                kept.append(pile)
+        list.__setitem__(self._piles, slice(None), kept)
+        if self._undo_log is not None:
+            self._undo_log.record(self._restore_piles, removed)
+        self._slots = {p.uid: i for i, p in enumerate(kept)}
+        self._slots_valid = True
+        self._touch()
+
     def create_build(self, base_pile: Pile, added_card: Card, owner: str, created_round: int=1, declared_value: int | None=None) -> Build:
         # Remove base from board
         base_cards = base_pile.cards if isinstance(base_pile, Build) else base_pile
@@ -35,10 +493,11 @@ class Board:
         if existing_builds:
             # Merge into first existing build of same value
             existing = existing_builds[0]
-            before_len = len(existing.cards)
+            self._record_build(existing)
             existing.cards.extend(cards)
             # New locking rule: merging piles to same value always locks (value consolidation)
             existing.lock()
+            self._rehash_build(existing)
             return existing
 
         # Initial build (no existing build with this value)
@@ -46,7 +505,6 @@ class Board:
 
         # Absorb rule: ONLY single cards and 2-card piles/builds can be absorbed
         # 3+ card piles can only be used during capture, not absorbed into builds
-        from itertools import combinations
         eligible = []
         for p in self.piles:
             if isinstance(p, Build):
@@ -57,48 +515,18 @@ class Board:
                 # Only single cards or 2-card piles, NOT 3+ card piles
                 if len(p) == 1 or len(p) == 2:
                     eligible.append(p)
-        values = [sum(c.value_on_board() for c in (p.cards if isinstance(p, Build) else p)) for p in eligible]
-        direct = [i for i, v in enumerate(values) if v == target_value]
-        chosen_sets = []
-        used = set(direct)
-        for i in direct:
-            chosen_sets.append([i])
-        cand = [i for i in range(len(eligible)) if i not in used and values[i] < target_value]
-        subset_masks = []
-        for r in range(1, len(cand) + 1):
-            for combo in combinations(cand, r):
-                if sum(values[i] for i in combo) == target_value:
-                    subset_masks.append(combo)
-        best_combo = []
-
-        def backtrack(idx, current, used_indices):
-            nonlocal best_combo
-            if len(current) > len(best_combo):
-                best_combo = list(current)
-            if idx >= len(subset_masks):
-                return
-            for j in range(idx, len(subset_masks)):
-                mask = subset_masks[j]
-                if any(m in used_indices for m in mask):
-                    continue
-                current.append(mask)
-                backtrack(j + 1, current, used_indices | set(mask))
-                current.pop()
-
-        backtrack(0, [], set())
-        for combo in best_combo:
-            chosen_sets.append(list(combo))
-        absorb_flat = set()
-        for group in chosen_sets:
-            for idx in group:
-                absorb_flat.add(idx)
-        absorbed_any = False
-        for idx in sorted(absorb_flat, reverse=True):
-            pile = eligible[idx]
-            pile_cards = pile.cards if isinstance(pile, Build) else pile
-            new_build.cards.extend(pile_cards)
-            self.remove_pile(pile)
-            absorbed_any = True
+        values = [self.pile_value(p) for p in eligible]
+        # Direct matches are always absorbed; smaller piles are packed into the
+        # largest number of disjoint groups summing to the target
+        absorb_flat = {i for i, v in enumerate(values) if v == target_value}
+        cand = [i for i, v in enumerate(values) if v < target_value]
+        for group in select_groups([values[i] for i in cand], target_value):
+            absorb_flat.update(cand[j] for j in group)
+        absorbed = [eligible[idx] for idx in sorted(absorb_flat, reverse=True)]
+        for pile in absorbed:
+            new_build.cards.extend(pile.cards if isinstance(pile, Build) else pile)
+        self.remove_piles(absorbed)
+        absorbed_any = bool(absorbed)
 
         # Lock only if absorption actually occurred (external material pulled in)
         if absorbed_any:
@@ -108,10 +536,16 @@ class Board:
         return new_build
 
     def list_builds(self) -> List[Build]:
-        return [p for p in self.piles if isinstance(p, Build)]
+        return list(self._builds)
 
     def list_builds_by_value(self, value: int) -> List[Build]:
-        return [b for b in self.list_builds() if b.value == value]
+        return list(self._builds_by_value.get(value, ()))
+
+    def feed_build(self, build: Build, card: Card):
+        """Add a card to a build via trotta/feed (allowed on locked builds, locks it)."""
+        self._record_build(build)
+        build.add_trotta_card(card)
+        self._rehash_build(build)
 
     def is_empty(self) -> bool:
         return len(self.piles) == 0
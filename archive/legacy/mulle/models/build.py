@@ -8,6 +8,7 @@ class Build:
         self.target_value: int = target_value  # the declared value of the build
         self.locked: bool = locked
         self.created_round: int = created_round  # Track which round this build was created
+        self.uid: int | None = None  # board handle, assigned when placed on a Board
 
     @property
     def value(self) -> int:
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import ClassVar
+from dataclasses import dataclass, field
+from typing import ClassVar, Dict, Tuple
 
 SUITS = ["KL", "SP", "HJ", "RU"]  # Clubs, Spades, Hearts, Diamonds (Swedish codes)
 RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
@@ -9,28 +9,101 @@ RANK_VALUES_BOARD = {
     "10": 10, "J": 11, "Q": 12, "K": 13, "A": 1  # Ace=1 on board
 }
 
-@dataclass(frozen=True)
+# 1 point cards: SP 3-K, RU A, KL A, HJ A
+INTAKE_POINTS_1 = {"SP": ["3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"], "RU": ["A"], "HJ": ["A"], "KL": ["A"]}
+# 2 point cards: SP 2, SP A, RU 10
+INTAKE_POINTS_2 = {"SP": ["2", "A"], "RU": ["10"]}
+
+# --- Global card table ---
+# Two decks give 104 cards. A card id is copy * 52 + face, where face is
+# suit_index * 13 + rank_index, so both copies of a card share the same face and
+# the twin of id i is (i + 52) % 104. This matches the deck_id order used by Deck.
+FACE_COUNT = len(SUITS) * len(RANKS)
+CARD_COUNT = 2 * FACE_COUNT
+
+_FACE_INDEX: Dict[Tuple[str, str], int] = {
+    (suit, rank): s * len(RANKS) + r for s, suit in enumerate(SUITS) for r, rank in enumerate(RANKS)
+}
+FACE_CODES: Tuple[str, ...] = tuple(f"{suit} {rank}" for suit in SUITS for rank in RANKS)
+
+
+def _hand_value(suit: str, rank: str) -> int:
+    # Ace=14 in hand, Spader 2 = 15 i hand, Ruter 10 = 16 i hand
+    if rank == "A":
+        return 14
+    return Card.SPECIAL_HAND_VALUES.get((suit, rank), RANK_VALUES_BOARD[rank])
+
+
+def _intake_points(suit: str, rank: str) -> int:
+    pts = 0
+    if rank in INTAKE_POINTS_1.get(suit, ()):
+        pts += 1
+    if rank in INTAKE_POINTS_2.get(suit, ()):
+        pts += 2
+    return pts
+
+
+def _face_table(fn) -> Tuple[int, ...]:
+    per_face = [fn(suit, rank) for suit in SUITS for rank in RANKS]
+    return tuple(per_face * 2)
+
+
+def _copy_of(face: int, deck_id: int) -> int:
+    """Which of the two copies a card is.
+
+    Deck order ids (copy * 52 + face) give the copy directly. Any other deck_id,
+    like the small numbers used for cards made by hand, picks the copy by
+    parity, so ``Card(s, r, 0)`` and ``Card(s, r, 1)`` are twins with distinct ids.
+    A two-deck game has no third copy: ``Card(s, r, 2)`` is the same table card
+    as ``Card(s, r, 0)`` and compares equal to it, since cards compare by id.
+    """
+    if deck_id % FACE_COUNT == face:
+        return deck_id // FACE_COUNT % 2
+    return deck_id % 2
+
+
+def card_id(suit: str, rank: str, copy: int = 0) -> int:
+    """Id of a card in the global table (copy 0 or 1 of the two decks)."""
+    return copy * FACE_COUNT + _FACE_INDEX[(suit, rank)]
+
+
+@dataclass(frozen=True, eq=False)
 class Card:
     suit: str
     rank: str
     deck_id: int  # distinguish duplicates across two decks
+    # Derived from suit/rank/deck_id in __post_init__
+    id: int = field(init=False, repr=False)
+    face: int = field(init=False, repr=False)
 
     SPECIAL_HAND_VALUES: ClassVar[dict] = {
         ("SP", "2"): 15,  # Spader 2 = 15 i hand
         ("RU", "10"): 16  # Ruter 10 = 16 i hand
     }
 
+    def __post_init__(self):
+        face = _FACE_INDEX[(self.suit, self.rank)]
+        object.__setattr__(self, "face", face)
+        object.__setattr__(self, "id", _copy_of(face, self.deck_id) * FACE_COUNT + face)
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
     def value_on_board(self) -> int:
-        return RANK_VALUES_BOARD[self.rank]
+        return BOARD_VALUE[self.id]
 
     def value_in_hand(self) -> int:
-        # Ace=14 in hand
-        if self.rank == "A":
-            return 14
-        return self.SPECIAL_HAND_VALUES.get((self.suit, self.rank), self.value_on_board())
+        return HAND_VALUE[self.id]
 
     def code(self) -> str:
-        return f"{self.suit} {self.rank}"
+        return FACE_CODES[self.face]
 
     def __str__(self) -> str:  # human friendly
         return self.code()
@@ -38,3 +111,18 @@ class Card:
     def __repr__(self) -> str:
         return f"Card({self.suit},{self.rank},id={self.deck_id})"
 
+
+# Precomputed per-id arrays used on the hot paths
+BOARD_VALUE: Tuple[int, ...] = _face_table(lambda suit, rank: RANK_VALUES_BOARD[rank])
+HAND_VALUE: Tuple[int, ...] = _face_table(_hand_value)
+INTAKE_POINTS: Tuple[int, ...] = _face_table(_intake_points)
+# Points for a mulle of this card: ace counts as 14, all others their board value
+MULLE_POINTS: Tuple[int, ...] = _face_table(lambda suit, rank: 14 if rank == "A" else RANK_VALUES_BOARD[rank])
+TWIN_ID: Tuple[int, ...] = tuple((i + FACE_COUNT) % CARD_COUNT for i in range(CARD_COUNT))
+
+# Interned cards, CARDS[i].id == CARDS[i].deck_id == i
+CARDS: Tuple[Card, ...] = tuple(
+    Card(suit, rank, copy * FACE_COUNT + face)
+    for copy in range(2)
+    for face, (suit, rank) in enumerate((suit, rank) for suit in SUITS for rank in RANKS)
+)
@@ -0,0 +1,158 @@
+"""Compact card sets stored as 104-bit integer masks indexed by card id."""
+
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Tuple
+
+from .build import Build
+from .card import CARD_COUNT, CARDS, FACE_COUNT, INTAKE_POINTS, MULLE_POINTS, Card
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .board import Board
+    from .player import Player
+
+
+def _masks_by_points(points) -> List[tuple]:
+    """(points, mask) for every non-zero entry of a per-id points table."""
+    masks = {}
+    for cid, pts in enumerate(points):
+        if pts:
+            masks[pts] = masks.get(pts, 0) | (1 << cid)
+    return sorted(masks.items())
+
+
+FULL_MASK = (1 << CARD_COUNT) - 1
+_INTAKE_MASKS = _masks_by_points(INTAKE_POINTS)
+_MULLE_MASKS = _masks_by_points(MULLE_POINTS)
+
+
+def twin_mask(mask: int) -> int:
+    """Ids of the twins of the cards in ``mask`` (the copies swap halves)."""
+    return ((mask << FACE_COUNT) | (mask >> FACE_COUNT)) & FULL_MASK
+
+
+def iter_ids(mask: int) -> Iterator[int]:
+    """Card ids set in ``mask`` in increasing order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class CardSet:
+    """Set of cards backed by a single int, with the list methods Player uses.
+
+    Cards are identified by ``Card.id`` only and iteration yields the interned
+    ``CARDS`` in id order, so the set is meant for cards dealt from a ``Deck``.
+    Adding, removing and membership are O(1); scoring uses popcounts.
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, cards: Iterable[Card] = (), mask: int = 0):
+        for c in cards:
+            mask |= 1 << c.id
+        self.mask = mask
+
+    @classmethod
+    def full(cls) -> "CardSet":
+        return cls(mask=FULL_MASK)
+
+    # --- list-compatible mutation ---
+    def append(self, card: Card):
+        self.mask |= 1 << card.id
+
+    add = append
+
+    def extend(self, cards: Iterable[Card]):
+        for c in cards:
+            self.mask |= 1 << c.id
+
+    def remove(self, card: Card):
+        bit = 1 << card.id
+        if not self.mask & bit:
+            raise ValueError(f"{card.code()} finns inte i kortmängden")
+        self.mask ^= bit
+
+    def discard(self, card: Card):
+        self.mask &= ~(1 << card.id)
+
+    def clear(self):
+        self.mask = 0
+
+    def copy(self) -> "CardSet":
+        return CardSet(mask=self.mask)
+
+    __copy__ = copy
+
+    # --- queries ---
+    def __contains__(self, card: Card) -> bool:
+        return bool(self.mask >> card.id & 1)
+
+    def __iter__(self) -> Iterator[Card]:
+        return (CARDS[cid] for cid in iter_ids(self.mask))
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __getitem__(self, index: int) -> Card:
+        cards = list(self)
+        return cards[index]
+
+    def ids(self) -> List[int]:
+        return list(iter_ids(self.mask))
+
+    def intake_points(self) -> int:
+        return sum(pts * (self.mask & m).bit_count() for pts, m in _INTAKE_MASKS)
+
+    def mulle_points(self) -> int:
+        return sum(pts * (self.mask & m).bit_count() for pts, m in _MULLE_MASKS)
+
+    # --- set algebra ---
+    def __or__(self, other: "CardSet") -> "CardSet":
+        return CardSet(mask=self.mask | other.mask)
+
+    def __and__(self, other: "CardSet") -> "CardSet":
+        return CardSet(mask=self.mask & other.mask)
+
+    def __sub__(self, other: "CardSet") -> "CardSet":
+        return CardSet(mask=self.mask & ~other.mask)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CardSet):
+            return self.mask == other.mask
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CardSet({[c.code() for c in self]})"
+
+
+def unseen_cards(board: "Board", players: Iterable["Player"], viewer: "Player") -> CardSet:
+    """Cards ``viewer`` has not seen: not in its hand, on the board or captured by anyone."""
+    seen = CardSet(viewer.hand)
+    for pile in board.piles:
+        seen.extend(pile.cards if isinstance(pile, Build) else pile)
+    for p in players:
+        seen.extend(p.captured)
+    return CardSet.full() - seen
+
+
+def twins_on_board(board: "Board", player: "Player") -> CardSet:
+    """Cards in ``player``'s hand whose twin lies on the board (mulle chances)."""
+    return CardSet(mask=player.hand_mask & twin_mask(board.card_mask))
+
+
+def twin_location(card: Card, board: "Board", players: Iterable["Player"]) -> Tuple[str, object]:
+    """Where the twin of ``card`` is: ("board", pile), ("hand"|"captured", player) or ("unseen", None)."""
+    tid = (card.id + FACE_COUNT) % CARD_COUNT
+    pile = board.pile_holding(tid)
+    if pile is not None:
+        return "board", pile
+    bit = 1 << tid
+    for p in players:
+        if p.hand_mask & bit:
+            return "hand", p
+        if p.captured_mask & bit:
+            return "captured", p
+    return "unseen", None
@@ -1,20 +1,14 @@
 import random
 from typing import List
-from .card import Card, SUITS, RANKS
+from .card import CARDS, Card
 
 class Deck:
-    def __init__(self, seed: int | None = None):
-        self._cards: List[Card] = []
-        deck_id = 0
-        # Two standard decks
-        for duplicate in range(2):
-            for suit in SUITS:
-                for rank in RANKS:
-                    self._cards.append(Card(suit, rank, deck_id))
-                    deck_id += 1
-        if seed is not None:
-            random.seed(seed)
-        random.shuffle(self._cards)
+    def __init__(self, seed: int | None = None, rng: random.Random | None = None):
+        # Two standard decks, shared interned cards in deck_id order
+        self._cards: List[Card] = list(CARDS)
+        # Own stream: Random(seed) deals exactly what random.seed(seed) used to
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.rng.shuffle(self._cards)
 
     def draw(self) -> Card:
         if not self._cards:
@@ -0,0 +1,41 @@
+from typing import Tuple
+
+# Move kinds understood by rules.capture.apply_move
+MOVE_KINDS = ("capture", "build", "trotta", "feed", "discard")
+
+
+class Move:
+    """A move as plain data: what is played and which board piles it targets.
+
+    Cards are referred to by ``Card.id`` and piles by their board handle
+    (``uid``), so a move stays valid for copies of the same position and can be
+    hashed, compared, cached and pickled without dragging the board along.
+    """
+
+    __slots__ = ("kind", "card_id", "pile_ids", "declared_value")
+
+    def __init__(self, kind: str, card_id: int, pile_ids: Tuple[int, ...] = (), declared_value: int | None = None):
+        if kind not in MOVE_KINDS:
+            raise ValueError(f"Okänd draggtyp: {kind}")
+        self.kind = kind
+        self.card_id = card_id
+        self.pile_ids = tuple(pile_ids)
+        self.declared_value = declared_value
+
+    def key(self) -> tuple:
+        return (self.kind, self.card_id, self.pile_ids, self.declared_value)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Move):
+            return NotImplemented
+        return self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __reduce__(self):
+        return (Move, self.key())
+
+    def __repr__(self):
+        extra = f", declared={self.declared_value}" if self.declared_value is not None else ""
+        return f"Move({self.kind}, card={self.card_id}, piles={list(self.pile_ids)}{extra})"
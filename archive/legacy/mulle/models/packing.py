@@ -0,0 +1,224 @@
+"""Subset-sum packing over pile values.
+
+The forced-capture rule ("tvångsintag") asks for the largest collection of
+disjoint pile groups that each sum to the played card's value. Piles with the
+same value are interchangeable for that question, so the optimum is solved as a
+memoized dynamic program over the value histogram instead of over pile subsets.
+The concrete piles are then picked greedily in the same order the original
+exhaustive search visited them, which keeps the chosen capture identical.
+
+Build absorption ("bygga in") asks a sibling question: the largest number of
+disjoint groups, rather than piles, and is answered by :func:`select_groups`
+with the same machinery. :func:`subset_sum_mask` answers the cheaper yes/no
+question "can any set of piles add up to v" for all values at once.
+"""
+
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+# Largest value a card can take in hand (RU 10 = 16)
+SUM_LIMIT = 16
+
+
+def subset_sum_mask(values: Iterable[int], limit: int = SUM_LIMIT) -> int:
+    """Bit ``v`` is set when some subset of ``values`` sums to ``v`` (``v <= limit``).
+
+    A shift-or over a Python int: one word operation per value answers all
+    targets at once.
+    """
+    full = (1 << (limit + 1)) - 1
+    reach = 1
+    for v in values:
+        if 0 < v <= limit:
+            reach |= (reach << v) & full
+    return reach
+
+
+def _fitting_groups(hist: Tuple[int, ...], target: int, max_part: int | None = None) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+    """Yield ``(size, rest)`` for every value multiset in ``hist`` summing to ``target``.
+
+    ``rest`` is the histogram left after removing the group. Groups are
+    generated with non-increasing values no larger than ``max_part``, so every
+    multiset appears once.
+    """
+    rest = list(hist)
+
+    def walk(remaining: int, max_part: int, size: int):
+        if remaining == 0:
+            yield size, tuple(rest)
+            return
+        for value in range(min(remaining, max_part), 0, -1):
+            if rest[value]:
+                rest[value] -= 1
+                yield from walk(remaining - value, value, size + 1)
+                rest[value] += 1
+
+    # Values equal to the target are direct matches and never part of a group
+    return walk(target, target - 1 if max_part is None else max_part, 0)
+
+
+def _upper_bound(hist: Tuple[int, ...], target: int) -> int:
+    """Most piles that could ever be packed: the smallest ones filling whole groups."""
+    total = 0
+    for value, count in enumerate(hist):
+        if count:
+            total += value * count
+    budget = total - total % target
+    count = 0
+    for value, available in enumerate(hist):
+        if not available:
+            continue
+        take = min(available, budget // value)
+        count += take
+        budget -= take * value
+        if take < available:
+            break
+    return count
+
+
+@lru_cache(maxsize=1 << 16)
+def _best_count(hist: Tuple[int, ...], target: int) -> int:
+    """Maximum number of piles covered by disjoint groups summing to ``target``."""
+    bound = _upper_bound(hist, target)
+    if not bound:
+        return 0
+    largest = len(hist) - 1
+    while not hist[largest]:
+        largest -= 1
+    # Either one pile of the largest value stays on the board ...
+    dropped = list(hist)
+    dropped[largest] -= 1
+    dropped = tuple(dropped)
+    best = _best_count(dropped, target)
+    if best >= bound:
+        return best
+    # ... or it is packed into a group together with smaller piles
+    for size, rest in _fitting_groups(dropped, target - largest, largest):
+        best = max(best, size + 1 + _best_count(rest, target))
+        if best >= bound:
+            break
+    return best
+
+
+def _first_combination(values: Sequence[int], alive: List[Tuple[int, ...]], size: int) -> Tuple[int, ...]:
+    """Lexicographically first index tuple whose value multiset is one of ``alive``.
+
+    ``values`` holds the values of the still available positions (``0`` marks a
+    position that is already used).
+    """
+    n = len(values)
+    width = len(alive[0])
+    # suffix[i][v] = number of available positions >= i with value v
+    suffix = [[0] * width for _ in range(n + 1)]
+    for i in range(n - 1, -1, -1):
+        row = list(suffix[i + 1])
+        if values[i]:
+            row[values[i]] += 1
+        suffix[i] = row
+
+    chosen: List[int] = []
+    start = 0
+    while len(chosen) < size:
+        for i in range(start, n):
+            v = values[i]
+            if not v:
+                continue
+            remaining = [tuple(c - (1 if idx == v else 0) for idx, c in enumerate(t)) for t in alive if t[v] > 0]
+            tail = suffix[i + 1]
+            remaining = [t for t in remaining if all(t[k] <= tail[k] for k in range(1, width))]
+            if remaining:
+                chosen.append(i)
+                alive = remaining
+                start = i + 1
+                break
+        else:  # pragma: no cover - alive is always reachable by construction
+            raise RuntimeError("Ingen kombination hittades för packningen")
+    return tuple(chosen)
+
+
+def select_packing(values: Sequence[int], target: int) -> List[Tuple[int, ...]]:
+    """Pick disjoint index groups of ``values`` that each sum to ``target``.
+
+    The groups maximise the total number of covered positions. Among equally
+    good packings the result is the one the exhaustive search ordered by
+    ``(-len(group), group)`` finds first, so callers get the same piles as
+    before. Values must be positive and smaller than ``target``.
+    """
+    if target < 2:
+        return []
+    hist = [0] * target
+    for v in values:
+        hist[v] += 1
+    need = _best_count(tuple(hist), target)
+    available = list(values)
+    groups: List[Tuple[int, ...]] = []
+    while need > 0:
+        current = tuple(hist)
+        good: List[Tuple[int, Tuple[int, ...]]] = []
+        for size, rest in _fitting_groups(current, target):
+            if size + _best_count(rest, target) == need:
+                good.append((size, tuple(c - r for c, r in zip(current, rest))))
+        size = max(s for s, _ in good)
+        group = _first_combination(available, [c for s, c in good if s == size], size)
+        for i in group:
+            hist[available[i]] -= 1
+            available[i] = 0
+        groups.append(group)
+        need -= size
+    return groups
+
+
+@lru_cache(maxsize=1 << 16)
+def _best_groups(hist: Tuple[int, ...], target: int) -> int:
+    """Maximum number of disjoint groups summing to ``target``."""
+    total = 0
+    for value, count in enumerate(hist):
+        total += value * count
+    bound = total // target
+    if not bound:
+        return 0
+    largest = len(hist) - 1
+    while not hist[largest]:
+        largest -= 1
+    dropped = list(hist)
+    dropped[largest] -= 1
+    dropped = tuple(dropped)
+    best = _best_groups(dropped, target)
+    if best >= bound:
+        return best
+    for _, rest in _fitting_groups(dropped, target - largest, largest):
+        best = max(best, 1 + _best_groups(rest, target))
+        if best >= bound:
+            break
+    return best
+
+
+def select_groups(values: Sequence[int], target: int) -> List[Tuple[int, ...]]:
+    """Pick the largest number of disjoint index groups of ``values`` summing to ``target``.
+
+    Among packings with as many groups as possible the result is the one the
+    exhaustive search ordered by ``(len(group), group)`` finds first. Values
+    must be positive and smaller than ``target``.
+    """
+    if target < 2:
+        return []
+    hist = [0] * target
+    for v in values:
+        hist[v] += 1
+    need = _best_groups(tuple(hist), target)
+    available = list(values)
+    groups: List[Tuple[int, ...]] = []
+    while need > 0:
+        current = tuple(hist)
+        good: List[Tuple[int, Tuple[int, ...]]] = []
+        for size, rest in _fitting_groups(current, target):
+            if 1 + _best_groups(rest, target) == need:
+                good.append((size, tuple(c - r for c, r in zip(current, rest))))
+        size = min(s for s, _ in good)
+        group = _first_combination(available, [c for s, c in good if s == size], size)
+        for i in group:
+            hist[available[i]] -= 1
+            available[i] = 0
+        groups.append(group)
+        need -= 1
+    return groups
@@ -1,38 +1,188 @@
 from typing import List
-from .card import Card
+from .card import MULLE_POINTS, Card
+from .cardset import CardSet
+from .zobrist import CAPTURED_KEYS, HAND_KEYS, MULLE_KEYS, tabbe_key
+
+# Zobrist key table per card collection
+_KEYS = {"hand": HAND_KEYS, "captured": CAPTURED_KEYS, "mulles": MULLE_KEYS}
+
 
 class Player:
-    def __init__(self, name: str):
+    def __init__(self, name: str, compact: bool = False):
         self.name = name
-        self.hand: List[Card] = []
-        self.captured: List[Card] = []  # non-mulle captured
-        self.mulles: List[Card] = []     # cards representing mulle points
+        # compact=True stores the card collections as CardSet bitmasks (O(1) add/remove,
+        # popcount scoring, cheap copies); hand order is then card id order
+        self.compact = compact
+        self.hand: List[Card] = CardSet() if compact else []
+        self.captured: List[Card] = CardSet() if compact else []  # non-mulle captured
+        self.mulles: List[Card] = CardSet() if compact else []     # cards representing mulle points
         self.tabbe: int = 0
+        # UndoLog recording inverse operations while a move search is active
+        self._undo_log = None
+        # Zobrist hash of hand/captured/mulles, kept in step by the methods below
+        self._zhash = 0
+        # Card id bit masks per collection, kept in step the same way
+        self._masks = dict.fromkeys(_KEYS, 0)
+
+    # --- hashing and undo helpers ---
+    def _toggle(self, attr: str, cards):
+        keys = _KEYS[attr]
+        h = self._zhash
+        m = self._masks[attr]
+        for c in cards:
+            h ^= keys[c.id]
+            m ^= 1 << c.id
+        self._zhash = h
+        self._masks[attr] = m
+
+    def _check_new(self, attr: str, cards: List[Card]):
+        """Reject cards whose id is already in the collection (or repeated in ``cards``)."""
+        mask = self._masks[attr]
+        for c in cards:
+            bit = 1 << c.id
+            if mask & bit:
+                raise ValueError(f"{c.code()} (id {c.id}) finns redan i {attr}")
+            mask |= bit
+
+    def _unrecorded(self, attr: str, cards: List[Card]) -> List[Card]:
+        """``cards`` whose id is not in the collection yet, each id once (as a CardSet keeps them)."""
+        mask = self._masks[attr]
+        new = []
+        for c in cards:
+            bit = 1 << c.id
+            if not mask & bit:
+                mask |= bit
+                new.append(c)
+        return new
+
+    def _added(self, attr: str, cards: List[Card]):
+        self._toggle(attr, cards)
+        if self._undo_log is not None:
+            self._undo_log.record(self._drop_added, attr, cards)
 
+    def _drop_added(self, attr: str, cards: List[Card]):
+        """Undo helper: take back cards that were appended to a collection."""
+        collection = getattr(self, attr)
+        if isinstance(collection, CardSet):
+            for c in cards:
+                collection.discard(c)
+        else:
+            del collection[len(collection) - len(cards):]
+        self._toggle(attr, cards)
+
+    def _put_back(self, index: int, card: Card):
+        """Undo helper: return a played card to its old hand position."""
+        if self.compact:
+            self.hand.append(card)
+        else:
+            self.hand.insert(index, card)
+        self._toggle("hand", (card,))
+
+    def _refill(self, attr: str, cards: List[Card]):
+        """Undo helper: restore a collection emptied by clear_hand/reset_round."""
+        getattr(self, attr).extend(cards)
+        self._toggle(attr, cards)
+
+    def _clear(self, attr: str):
+        collection = getattr(self, attr)
+        cards = list(collection)
+        collection.clear()
+        self._toggle(attr, cards)
+        if self._undo_log is not None:
+            self._undo_log.record(self._refill, attr, cards)
+
+    # --- mutation ---
     def add_to_hand(self, cards: List[Card]):
+        cards = list(cards)
+        self._check_new("hand", cards)
         self.hand.extend(cards)
+        self._added("hand", cards)
 
     def remove_from_hand(self, card: Card):
-        self.hand.remove(card)
+        if self.compact:
+            self.hand.remove(card)
+            index = 0
+        else:
+            index = self.hand.index(card)
+            card = self.hand.pop(index)
+        self._toggle("hand", (card,))
+        if self._undo_log is not None:
+            self._undo_log.record(self._put_back, index, card)
+
+    def clear_hand(self):
+        self._clear("hand")
 
     def record_mulle(self, card: Card):
+        if self._masks["mulles"] >> card.id & 1:
+            return
         self.mulles.append(card)
+        self._added("mulles", [card])
 
     def record_capture(self, cards: List[Card]):
+        # A hand-made card equal to one already captured is the same table card
+        cards = self._unrecorded("captured", cards)
         self.captured.extend(cards)
+        self._added("captured", cards)
+
+    def record_tabbe(self):
+        if self._undo_log is not None:
+            self._undo_log.record(setattr, self, "tabbe", self.tabbe)
+        self.tabbe += 1
+
+    def reset_round(self):
+        """Clear captured cards, mulles and tabbe count for a new round."""
+        self._clear("captured")
+        self._clear("mulles")
+        if self._undo_log is not None:
+            self._undo_log.record(setattr, self, "tabbe", self.tabbe)
+        self.tabbe = 0
+
+    # --- queries ---
+    @property
+    def zhash(self) -> int:
+        """Zobrist hash of hand, captured, mulles and tabbe count.
+
+        Kept up to date by the methods above; collections mutated directly
+        are not tracked.
+        """
+        return self._zhash ^ tabbe_key(self.tabbe)
+
+    @property
+    def hand_mask(self) -> int:
+        """Ids of the cards in hand as a bit mask (see ``CardSet``)."""
+        return self._masks["hand"]
+
+    @property
+    def captured_mask(self) -> int:
+        return self._masks["captured"]
+
+    @property
+    def mulle_mask(self) -> int:
+        return self._masks["mulles"]
+
+    def compute_zhash(self) -> int:
+        """Recompute ``zhash`` from scratch (for verification)."""
+        h = tabbe_key(self.tabbe)
+        for attr, keys in _KEYS.items():
+            for c in getattr(self, attr):
+                h ^= keys[c.id]
+        return h
 
     def total_mulle_points(self) -> int:
-        points = 0
-        for c in self.mulles:
-            if c.rank == "A":
-                points += 14  # assumption
-            elif c.rank in ["J", "Q", "K"]:
-                # Face cards map to board values anyway
-                points += c.value_on_board()
-            else:
-                points += int(c.rank)
-        return points
+        if self.compact:
+            return self.mulles.mulle_points()
+        # Ace counts as 14 (assumption), face cards map to board values
+        return sum(MULLE_POINTS[c.id] for c in self.mulles)
+
+    def copy(self) -> "Player":
+        clone = Player(self.name, compact=self.compact)
+        clone.hand = self.hand.copy()
+        clone.captured = self.captured.copy()
+        clone.mulles = self.mulles.copy()
+        clone.tabbe = self.tabbe
+        clone._zhash = self._zhash
+        clone._masks = dict(self._masks)
+        return clone
 
     def __str__(self):
         return self.name
-
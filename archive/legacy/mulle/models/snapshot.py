@@ -0,0 +1,65 @@
+"""Immutable board snapshots for observations that outlive the position.
+
+A snapshot is a tuple of :class:`FrozenPile` records. ``Board.snapshot`` keeps
+the frozen record of every pile and only re-freezes piles whose hash changed,
+so consecutive snapshots share all untouched piles and a step costs
+O(changed piles) instead of a deep copy.
+"""
+
+from typing import Iterator, NamedTuple, Tuple
+
+from .build import Build
+from .card import Card
+
+
+class FrozenPile(NamedTuple):
+    """Read-only copy of a board pile; ``owner`` is set for builds only."""
+
+    uid: int
+    cards: Tuple[Card, ...]
+    value: int
+    owner: str | None = None
+    locked: bool = False
+    created_round: int = 1
+
+    @property
+    def is_build(self) -> bool:
+        return self.owner is not None
+
+
+def freeze_pile(pile, uid: int, value: int) -> FrozenPile:
+    if isinstance(pile, Build):
+        return FrozenPile(uid, tuple(pile.cards), value, pile.owner, pile.locked, pile.created_round)
+    return FrozenPile(uid, tuple(pile), value)
+
+
+class BoardSnapshot:
+    """The piles of a board at one moment, in board order."""
+
+    __slots__ = ("piles", "zhash", "card_mask")
+
+    def __init__(self, piles: Tuple[FrozenPile, ...], zhash: int, card_mask: int):
+        self.piles = piles
+        self.zhash = zhash
+        self.card_mask = card_mask
+
+    def __len__(self) -> int:
+        return len(self.piles)
+
+    def __iter__(self) -> Iterator[FrozenPile]:
+        return iter(self.piles)
+
+    def cards(self) -> Iterator[Card]:
+        for pile in self.piles:
+            yield from pile.cards
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BoardSnapshot):
+            return NotImplemented
+        return self.piles == other.piles
+
+    def __hash__(self) -> int:
+        return self.zhash
+
+    def __repr__(self):
+        return f"BoardSnapshot({[[c.code() for c in p.cards] for p in self.piles]})"
@@ -0,0 +1,68 @@
+"""Zobrist keys for incremental 64-bit game-state hashing.
+
+Each hashed fact (a card in a hand, captured, as a mulle, a board pile, a
+tabbe count, the round number) owns a fixed random key, and a state hash is the
+XOR of the keys of the facts that hold. Board and Player keep their part of the
+hash up to date as they change; :func:`state_hash` combines the parts.
+
+Board piles hash as a unit (the cards of a pile mixed together with the build
+attributes) so that ``[a] [b]`` and ``[a, b]`` hash differently.
+"""
+
+import hashlib
+import random
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+from .card import CARD_COUNT
+
+MASK64 = (1 << 64) - 1
+
+_rng = random.Random(0x6D756C6C65)  # fixed seed: hashes are stable across processes
+
+
+def _keys(n: int) -> Tuple[int, ...]:
+    return tuple(_rng.getrandbits(64) for _ in range(n))
+
+
+HAND_KEYS = _keys(CARD_COUNT)
+CAPTURED_KEYS = _keys(CARD_COUNT)
+MULLE_KEYS = _keys(CARD_COUNT)
+PILE_CARD_KEYS = _keys(CARD_COUNT)
+TABBE_KEYS = _keys(64)
+ROUND_KEYS = _keys(64)
+TARGET_KEYS = _keys(32)
+SEAT_KEYS = _keys(8)
+PLAIN_PILE_KEY, BUILD_KEY, LOCKED_KEY = _keys(3)
+
+
+def mix64(x: int) -> int:
+    """SplitMix64 finalizer: a cheap non-linear 64-bit mixing step."""
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+    return x ^ (x >> 31)
+
+
+@lru_cache(maxsize=None)
+def owner_key(owner: str) -> int:
+    # str hashes are salted per process, so derive the key from a digest instead
+    return int.from_bytes(hashlib.blake2b(owner.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def cards_key(cards) -> int:
+    key = 0
+    for c in cards:
+        key ^= PILE_CARD_KEYS[c.id]
+    return key
+
+
+def tabbe_key(tabbe: int) -> int:
+    return TABBE_KEYS[tabbe & 63]
+
+
+def state_hash(board, players: Sequence, round_number: int) -> int:
+    """64-bit hash of board, players (by seat) and round number in O(players)."""
+    h = board.zhash ^ ROUND_KEYS[round_number & 63]
+    for seat, p in enumerate(players):
+        h ^= mix64(p.zhash ^ SEAT_KEYS[seat & 7])
+    return h
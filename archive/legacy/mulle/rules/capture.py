@@ -1,10 +1,13 @@
-from typing import List, Tuple, Callable
-from itertools import combinations
-from ..models.card import Card
-from ..models.board import Board, Pile
+from typing import List, Tuple
+from ..models.board import Board, Pile, pile_value
 from ..models.build import Build
+from ..models.card import CARDS, Card
+from ..models.move import Move
+from ..models.packing import select_packing
 from ..models.player import Player
 from mulle.rules.validation import InvalidAction, player_has_builds 
+from .capture_cache import capture_cache
+from .trotta import TrottaPlan, plan_trotta
 
 class ActionResult:
     def __init__(self, played: Card, captured: List[Card], mulle_pairs: List[List[Card]], build_created: bool=False):
@@ -17,102 +20,330 @@ class ActionResult:
         return f"Action(played={self.played.code()}, captured={[c.code() for c in self.captured]}, mulles={[[c.code() for c in pair] for pair in self.mulle_pairs]}, build_created={self.build_created})"
 
 class CandidateAction:
-    def __init__(self, category: str, predicted_reward: float, executor: Callable[[], ActionResult]):
-        self.category = category
-        self.predicted_reward = predicted_reward
-        self._executor = executor
+    """A legal ``Move`` bound to the board and player it was generated for.
+
+    Category and predicted reward are derived from the move on first access
+    (or just before ``execute`` applies it) and then kept.
+    """
+
+    __slots__ = ("move", "_board", "_player", "_round_number", "_ctx", "_features")
+
+    def __init__(self, move: Move, board: Board, player: Player, round_number: int=1, ctx: "TurnContext | None" = None):
+        self.move = move
+        self._board = board
+        self._player = player
+        self._round_number = round_number
+        self._ctx = ctx
+        self._features: Tuple[int, int] | None = None
+
+    def _capture_features(self) -> Tuple[int, int]:
+        if self._features is None:
+            self._features = capture_features(self._board, self.move)
+        return self._features
+
+    @property
+    def category(self) -> str:
+        kind = self.move.kind
+        if kind == "capture":
+            return 'capture_combo_mulle' if self._capture_features()[1] else 'capture_combo'
+        return kind
+
+    @property
+    def predicted_reward(self) -> float:
+        kind = self.move.kind
+        if kind == "capture":
+            size, mulles = self._capture_features()
+            return size + 5 * mulles
+        # Builds: modest reward for the potential future capture
+        return _FLAT_REWARDS.get(kind, 0.0)
+
+    def plays_on(self, board: Board, player: Player) -> bool:
+        """True if the action was generated for ``player`` on ``board``."""
+        return self._board is board and self._player is player
+
     def execute(self) -> ActionResult:
-        return self._executor()
+        if self.move.kind == "capture":
+            self._capture_features()  # category/reward stay readable after the piles are gone
+        return apply_move(self._board, self._player, self.move, self._round_number, self._ctx)
+
     def __repr__(self):
         return f"CandidateAction(cat={self.category}, reward={self.predicted_reward})"
 
+
+_FLAT_REWARDS = {"build": 1.5, "trotta": 1.0, "feed": 0.0, "discard": 0.0}
+
 # --- Helper functions ---
 
 def board_pile_value(pile: Pile) -> int:
-    if isinstance(pile, Build):
-        return pile.value
-    return sum(c.value_on_board() for c in pile)
+    return pile_value(pile)
+
+class TurnContext:
+    """Facts about one player's turn that several rules need, derived once.
+
+    Holds the reservation map (hand card -> the own build it alone can
+    capture), hand-value counts, the player's build values, the values blocked
+    by opponent builds and lazily computed capture options per card. A context
+    is only valid while the board and the player's hand are unchanged; the
+    rules functions check this and build a fresh one otherwise.
+    """
 
-def is_card_reserved_for_build(board: Board, player: Player, card: Card) -> Build | None:
+    __slots__ = ("board", "player", "version", "hand_hash", "hand", "hand_values",
+                 "own_build_values", "blocked_values", "_reserved", "_captures")
+
+    def __init__(self, board: Board, player: Player):
+        self.board = board
+        self.player = player
+        self.version = board.version
+        self.hand_hash = player.zhash
+        self.hand: List[Card] = list(player.hand)
+        self.hand_values: dict = {}
+        for c in self.hand:
+            v = c.value_in_hand()
+            self.hand_values[v] = self.hand_values.get(v, 0) + 1
+        self.own_build_values = set()
+        self.blocked_values = set()
+        self._reserved: dict = {}  # card id -> Build
+        matching: dict = {}
+        for c in self.hand:
+            matching.setdefault(c.value_in_hand(), []).append(c)
+        for build in board.list_builds():
+            if build.owner != player.name:
+                self.blocked_values.add(build.value)
+                continue
+            self.own_build_values.add(build.value)
+            cards = matching.get(build.value, ())
+            # The only card that can capture the build is reserved for it
+            if len(cards) == 1:
+                self._reserved.setdefault(cards[0].id, build)
+        self._captures: dict = {}
+
+    def matches(self, board: Board, player: Player) -> bool:
+        return (self.board is board and self.player is player
+                and self.version == board.version and self.hand_hash == player.zhash)
+
+    @property
+    def has_builds(self) -> bool:
+        return bool(self.own_build_values)
+
+    def reserved_build(self, card: Card) -> Build | None:
+        return self._reserved.get(card.id)
+
+    def has_reservation(self, value: int, card: Card) -> bool:
+        """True if a hand card other than ``card`` has hand value ``value``."""
+        return self.hand_values.get(value, 0) > (card.value_in_hand() == value)
+
+    def captures(self, card: Card) -> List[List[Pile]]:
+        options = self._captures.get(card.id)
+        if options is None:
+            options = self._captures[card.id] = generate_capture_combinations(self.board, card)
+        return options
+
+    def can_capture(self, card: Card) -> bool:
+        options = self._captures.get(card.id)
+        if options is not None:
+            return bool(options)
+        return capture_possible(self.board, card)
+
+
+def turn_context(board: Board, player: Player, ctx: TurnContext | None = None) -> TurnContext:
+    """``ctx`` if it still describes this position, otherwise a new context."""
+    if ctx is not None and ctx.matches(board, player):
+        return ctx
+    return TurnContext(board, player)
+
+
+def is_card_reserved_for_build(board: Board, player: Player, card: Card, ctx: TurnContext | None = None) -> Build | None:
     """
     Check if a card is reserved as the only capture card for a player's build.
     Returns the build if the card is reserved, None otherwise.
     """
-    card_hand_value = card.value_in_hand()
+    return turn_context(board, player, ctx).reserved_build(card)
+
+
+# --- Side-effect free legality predicates (mirror the perform_* checks) ---
+
+def can_feed(board: Board, player: Player, card: Card, ctx: TurnContext | None = None) -> bool:
+    """True if ``perform_discard`` would feed ``card`` into one of the player's builds."""
+    ctx = turn_context(board, player, ctx)
+    return card.value_on_board() in ctx.own_build_values and ctx.reserved_build(card) is None
+
+
+def can_discard(board: Board, player: Player, card: Card, ctx: TurnContext | None = None) -> bool:
+    """True if ``perform_discard`` accepts ``card`` (plain discard or feed)."""
+    ctx = turn_context(board, player, ctx)
+    if not ctx.has_builds:
+        return True  # without builds no card is reserved
+    return can_feed(board, player, card, ctx)
+
+
+def can_trotta(board: Board, player: Player, card: Card, ctx: TurnContext | None = None) -> bool:
+    return plan_trotta(board, player, card, ctx=ctx) is not None
+
 
-    # Check each build owned by the player
-    for build in board.list_builds():
-        if build.owner == player.name and build.value == card_hand_value:
-            # Count how many cards in hand can capture this build
-            matching_cards = [c for c in player.hand if c.value_in_hand() == build.value]
-            # If this is the only card that can capture the build, it's reserved
-            if len(matching_cards) == 1 and matching_cards[0] is card:
-                return build
-    return None
+def discard_options(board: Board, player: Player, ctx: TurnContext | None = None) -> List[Card]:
+    """Hand cards ``perform_discard`` accepts, in hand order."""
+    ctx = turn_context(board, player, ctx)
+    if not ctx.has_builds:
+        return list(ctx.hand)
+    return [c for c in ctx.hand if can_feed(board, player, c, ctx)]
 
 
 # Check if player may build (must own build or extend single pile) and have reservation card
 
-def can_build(board: Board, player: Player, base_pile: Pile, added_card: Card) -> bool:
+def can_build(board: Board, player: Player, base_pile: Pile, added_card: Card, ctx: TurnContext | None = None) -> bool:
     base_cards = base_pile.cards if isinstance(base_pile, Build) else base_pile
     # Restrict: building on non-build piles allowed only for single-card piles
     if not isinstance(base_pile, Build) and len(base_cards) != 1:
         return False
 
+    # Building on builds: locked builds cannot be modified at all
+    if isinstance(base_pile, Build) and base_pile.locked:
+        return False
+
+    ctx = turn_context(board, player, ctx)
     target_value = sum(c.value_on_board() for c in base_cards) + added_card.value_on_board()
 
     # Enforce: cannot create/extend to a value X if opponent already has a build of value X
-    existing_same_value = board.list_builds_by_value(target_value)
-    for b in existing_same_value:
-        if b.owner != player.name:
-            return False
-
-    # Building on builds: locked builds cannot be modified at all
-    if isinstance(base_pile, Build) and base_pile.locked:
+    if target_value in ctx.blocked_values:
         return False
 
     # Removed special-card build restriction: values 14 (A), 15 (SP 2), 16 (RU 10) are now allowed to be built.
 
     # Check if the card being used to build is reserved for another build
-    reserved_build = is_card_reserved_for_build(board, player, added_card)
-    if reserved_build is not None:
+    if ctx.reserved_build(added_card) is not None:
         # Cannot use this card to build - it's the only card that can capture another build
         return False
 
     # Need reservation card matching new build value
-    for c in player.hand:
-        if c is not added_card and c.value_in_hand() == target_value:
-            return True
-    return False
+    return ctx.has_reservation(target_value, added_card)
+
+class BuildMatrix:
+    """Build legality for every hand card x board pile, computed in one pass.
+
+    ``up[i][j]`` is the value card ``i`` builds pile ``j`` up to (exactly the
+    builds ``can_build`` accepts), ``down[i][j]`` the value it builds the
+    opponent's open build ``j`` down to; ``None`` marks an illegal build.
+    """
+
+    __slots__ = ("cards", "piles", "up", "down")
+
+    def __init__(self, cards: List[Card], piles: List[Pile], up: List[list], down: List[list]):
+        self.cards = cards
+        self.piles = piles
+        self.up = up
+        self.down = down
+
+    def _legal(self, table: List[list]):
+        for i, row in enumerate(table):
+            for j, target in enumerate(row):
+                if target is not None:
+                    yield self.cards[i], self.piles[j], target
+
+    def builds_up(self):
+        """Legal (card, pile, value) build-ups in hand order, then board order."""
+        return self._legal(self.up)
+
+    def builds_down(self):
+        return self._legal(self.down)
+
+
+def build_matrix(board: Board, player: Player, ctx: TurnContext | None = None) -> BuildMatrix:
+    """Evaluate every (card, pile) build with shared hand-value counts and the build index."""
+    ctx = turn_context(board, player, ctx)
+    piles = list(board.piles)
+    blocked = ctx.blocked_values
+
+    # Card sum of each pile that may be built on (singles and open builds)
+    base_sums = []
+    for pile in piles:
+        if isinstance(pile, Build):
+            base_sums.append(None if pile.locked else sum(c.value_on_board() for c in pile.cards))
+        else:
+            base_sums.append(pile[0].value_on_board() if len(pile) == 1 else None)
+
+    up, down = [], []
+    for card in ctx.hand:
+        up_row = [None] * len(piles)
+        down_row = [None] * len(piles)
+        up.append(up_row)
+        down.append(down_row)
+        if ctx.reserved_build(card) is not None:
+            continue
+        value = card.value_on_board()
+        for j, base_sum in enumerate(base_sums):
+            if base_sum is None:
+                continue
+            # A reservation card for the new value, other than the card played
+            target = base_sum + value
+            if target not in blocked and ctx.has_reservation(target, card):
+                up_row[j] = target
+            pile = piles[j]
+            if isinstance(pile, Build) and pile.owner != player.name:
+                target = pile.value - value
+                if target >= 1 and target not in blocked and ctx.has_reservation(target, card):
+                    down_row[j] = target
+    return BuildMatrix(ctx.hand, piles, up, down)
 
 # Create build
 
-def perform_build(board: Board, player: Player, base_pile: Pile, added_card: Card, round_number: int=1, declared_value: int | None=None) -> ActionResult:
+def perform_build(board: Board, player: Player, base_pile: Pile, added_card: Card, round_number: int=1, declared_value: int | None=None, ctx: TurnContext | None = None) -> ActionResult:
+    # With a turn context, refuse to build away the only card that can capture
+    # an own build (as can_build does); plain calls keep building unchecked
+    if ctx is not None:
+        reserved_build = turn_context(board, player, ctx).reserved_build(added_card)
+        if reserved_build is not None:
+            raise ValueError(f"Cannot build with {added_card.code()} - it's reserved to capture your {reserved_build.value}-build!")
     # Locked builds cannot be modified (already checked in can_build)
     # Open builds can be modified by anyone
     build = board.create_build(base_pile, added_card, owner=player.name, created_round=round_number, declared_value=declared_value)
     player.remove_from_hand(added_card)
     return ActionResult(played=added_card, captured=[], mulle_pairs=[], build_created=True)
 
+def capture_possible(board: Board, card: Card) -> bool:
+    """O(1) check whether ``generate_capture_combinations`` finds anything for ``card``."""
+    target = card.value_in_hand()
+    if target in (14, 15, 16):
+        return bool(board.list_builds_by_value(target))
+    return board.can_reach(target)
+
 # Generate all capture combinations given a played card
 
-def generate_capture_combinations(board: Board, card: Card) -> List[List[Pile]]:
+def generate_capture_combinations(board: Board, card: Card, ctx: TurnContext | None = None) -> List[List[Pile]]:
+    # A context for this board position already caches the options per card
+    if ctx is not None and ctx.board is board and ctx.version == board.version:
+        return ctx.captures(card)
     target = card.value_in_hand()
     piles = list(board.piles)
-    n = len(piles)
     # Special values (14=A, 15=SP 2, 16=RU 10) may ONLY be captured via an existing build of that value.
     # Identical single-card capture does NOT apply to these.
     if target in [14, 15, 16]:
         matching_builds = [p for p in piles if isinstance(p, Build) and p.value == target]
         return [matching_builds] if matching_builds else []
 
+    # No set of piles adds up to the target: nothing to capture, skip the solver
+    if not board.can_reach(target):
+        return []
+
     # Normal identical single capture (non-special values): if exactly one identical single exists return that as sole option.
-    identical_single = [p for p in piles if not isinstance(p, Build) and len(p)==1 and p[0].code()==card.code()]
+    identical_single = [p for p in piles if not isinstance(p, Build) and len(p)==1 and p[0].face==card.face]
     if len(identical_single) == 1:
         return [[identical_single[0]]]
 
-    values = [board_pile_value(p) for p in piles]
+    # Packing depends only on pile values in board order: reuse earlier solutions
+    key = (board.value_signature(), target)
+    capture_indices = capture_cache.get(key)
+    if capture_indices is None:
+        capture_indices = _solve_capture(key[0], target)
+        capture_cache.put(key, capture_indices)
 
+    if not capture_indices:
+        return []
+    selected_piles = [piles[i] for i in capture_indices]
+    return [selected_piles]
+
+
+def _solve_capture(values: Tuple[int, ...], target: int) -> Tuple[int, ...]:
+    n = len(values)
     # Direct matches (must be included)
     direct_indices = [i for i, v in enumerate(values) if v == target]
     used = set(direct_indices)
@@ -120,65 +351,33 @@ def generate_capture_combinations(board: Board, card: Card) -> List[List[Pile]]:
     # Candidate indices for subset packing (exclude already used)
     cand_indices = [i for i in range(n) if i not in used and values[i] < target]
 
-    # Precompute all subsets of candidates that sum to target
-    subset_masks = []  # each mask is a frozenset of indices
-    for r in range(1, len(cand_indices)+1):
-        for combo in combinations(cand_indices, r):
-            if sum(values[i] for i in combo) == target:
-                subset_masks.append(frozenset(combo))
-
-    # Backtracking to select maximum number of disjoint subsets
-    best_selection: List[frozenset[int]] = []
-
-    subset_masks_sorted = sorted(subset_masks, key=lambda s: (-len(s), tuple(sorted(s))))
-
-    def backtrack(idx: int, used_now: set[int], chosen: List[frozenset[int]]):
-        nonlocal best_selection
-        # Prune if no better than current best (by pile count)
-        current_count = sum(len(s) for s in chosen)
-        best_count = sum(len(s) for s in best_selection)
-        if current_count > best_count:
-            best_selection = list(chosen)
-        if idx >= len(subset_masks_sorted):
-            return
-        for j in range(idx, len(subset_masks_sorted)):
-            mask = subset_masks_sorted[j]
-            if not (mask & used_now):
-                # choose
-                chosen.append(mask)
-                backtrack(j+1, used_now | set(mask), chosen)
-                chosen.pop()
-        # also consider skipping all remaining (already updated best if needed)
-
-    backtrack(0, set(used), [])
+    # Largest disjoint packing of candidate piles summing to target
+    groups = select_packing([values[i] for i in cand_indices], target)
 
     # Union of piles to capture = direct matches + all selected subsets
     capture_indices = set(direct_indices)
-    for m in best_selection:
-        capture_indices |= set(m)
+    for group in groups:
+        capture_indices.update(cand_indices[j] for j in group)
+    return tuple(sorted(capture_indices))
 
-    if not capture_indices:
-        return []
-    selected_piles = [piles[i] for i in sorted(capture_indices)]
-    return [selected_piles]
 # Detect mulle pairs among captured cards + played card (only pairs with exactly 2 identical cards in total capture group)
 
 def detect_mulles(all_captured: List[Card], played: Card) -> List[List[Card]]:
-    # Count by (suit, rank)
-    counts = {}
+    # Group by face id (suit + rank) in one pass
+    groups = {}
     for c in all_captured:
-        key = (c.suit, c.rank)
-        counts[key] = counts.get(key, 0) + 1
-    pairs = []
-    for (suit, rank), count in counts.items():
-        if count == 2:
-            pair = [c for c in all_captured if c.suit == suit and c.rank == rank]
-            pairs.append(pair)
-    return pairs
+        groups.setdefault(c.face, []).append(c)
+    return [group for group in groups.values() if len(group) == 2]
 
 # Perform capture using chosen combination
 
-def perform_capture(board: Board, player: Player, played_card: Card, chosen: List[Pile]) -> ActionResult:
+def perform_capture(board: Board, player: Player, played_card: Card, chosen: List[Pile] | None = None, ctx: TurnContext | None = None) -> ActionResult:
+    # Without a choice, take the solver's capture for the card
+    if chosen is None:
+        options = generate_capture_combinations(board, played_card, turn_context(board, player, ctx))
+        if not options:
+            raise InvalidAction(f"{played_card.code()} kan inte ta in något")
+        chosen = options[0]
     # Gather captured cards
     captured_cards: List[Card] = []
     for pile in chosen:
@@ -186,7 +385,7 @@ def perform_capture(board: Board, player: Player, played_card: Card, chosen: Lis
             captured_cards.extend(pile.cards)
         else:
             captured_cards.extend(pile)  # list of cards
-        board.remove_pile(pile)
+    board.remove_piles(chosen)
     player.remove_from_hand(played_card)
     # Played card also part of capture group
     full_group = list(captured_cards) + [played_card]
@@ -200,22 +399,22 @@ def perform_capture(board: Board, player: Player, played_card: Card, chosen: Lis
 
 # Discard
 
-def perform_discard(board: Board, player: Player, card: Card) -> ActionResult:
+def perform_discard(board: Board, player: Player, card: Card, ctx: TurnContext | None = None) -> ActionResult:
     # Check if this card is reserved for a build
-    reserved_build = is_card_reserved_for_build(board, player, card)
+    reserved_build = is_card_reserved_for_build(board, player, card, ctx)
     if reserved_build is not None:
         raise ValueError(f"Cannot discard {card.code()} - it's reserved to capture your {reserved_build.value}-build!")
 
     # Check if player has a build with the same value as the card being discarded
     # If so, add the card to that build (trotta/feed)
     card_value = card.value_on_board()
-    player_builds = [b for b in board.list_builds() if b.owner == player.name and b.value == card_value]
+    player_builds = [b for b in board.list_builds_by_value(card_value) if b.owner == player.name]
 
     if player_builds:
         # Add card to the first matching build (even if locked)
         build = player_builds[0]
         player.remove_from_hand(card)
-        build.add_trotta_card(card)
+        board.feed_build(build, card)
         return ActionResult(played=card, captured=[], mulle_pairs=[], build_created=False)
 
     # New rule: Cannot trail/discard if player has any builds on the board
@@ -231,70 +430,28 @@ def perform_discard(board: Board, player: Player, card: Card) -> ActionResult:
 # Trotta: create a build by gathering all matching value singles and 2-card combinations
 # OR add a card to an existing build with same value (even if locked)
 
-def perform_trotta(board: Board, player: Player, card: Card, round_number: int=1) -> ActionResult:
-    target_value = card.value_on_board()
-
-    # First check if player already has a build with this value
-    player_builds = [b for b in board.list_builds() if b.owner == player.name and b.value == target_value]
+def perform_trotta(board: Board, player: Player, card: Card, round_number: int=1, ctx: TurnContext | None = None) -> ActionResult:
+    return apply_trotta(board, player, plan_trotta(board, player, card, strict=True, ctx=ctx), round_number)
 
-    if player_builds:
+def apply_trotta(board: Board, player: Player, plan: TrottaPlan, round_number: int=1) -> ActionResult:
+    card = plan.card
+    if plan.feed is not None:
         # Add card to existing build (allowed even if locked)
-        build = player_builds[0]
         player.remove_from_hand(card)
-        build.add_trotta_card(card)
+        board.feed_build(plan.feed, card)
         return ActionResult(played=card, captured=[], mulle_pairs=[], build_created=False)
 
-    # Find all single cards with exact value
-    direct_singles = []
-    for pile in board.piles:
-        if not isinstance(pile, Build) and len(pile) == 1 and pile[0].value_on_board() == target_value:
-            direct_singles.append(pile)
-
-    # Find all 2-card piles/builds with total value equal to target
-    two_card_matches = []
-    for pile in board.piles:
-        if isinstance(pile, Build) and len(pile.cards) == 2:
-            if pile.value == target_value:
-                two_card_matches.append(pile)
-        elif isinstance(pile, list) and len(pile) == 2:
-            if sum(c.value_on_board() for c in pile) == target_value:
-                two_card_matches.append(pile)
-
-    # Also find all pairs of single cards that sum to target
-    single_piles = [p for p in board.piles if not isinstance(p, Build) and len(p) == 1]
-    for i in range(len(single_piles)):
-        for j in range(i+1, len(single_piles)):
-            p1, p2 = single_piles[i], single_piles[j]
-            if p1[0].value_on_board() + p2[0].value_on_board() == target_value:
-                # Add both as separate matches (they'll be absorbed individually)
-                if p1 not in two_card_matches and p1 not in direct_singles:
-                    two_card_matches.append(p1)
-                if p2 not in two_card_matches and p2 not in direct_singles:
-                    two_card_matches.append(p2)
-
-    # Must have at least one matching pile to trotta
-    all_matches = direct_singles + two_card_matches
-    if not all_matches:
-        raise ValueError(f"No piles matching value {target_value} to trotta")
-
-    # Trotta requires a reservation card of the same value when creating a new locked build
-    reservation_available = any(
-        c is not card and c.value_on_board() == target_value for c in player.hand
-    )
-    if not reservation_available:
-        raise ValueError("Trotta kräver ett reservationskort med samma värde")
-
     # Collect all cards from matched piles
     cards = [card]  # Start with played card
-    for pile in all_matches:
+    for pile in plan.absorbed:
         if isinstance(pile, Build):
             cards.extend(pile.cards)
         else:
             cards.extend(pile)
-        board.remove_pile(pile)
+    board.remove_piles(plan.absorbed)
 
     # Create locked build
-    new_build = Build(cards, owner=player.name, target_value=target_value, locked=True, created_round=round_number)
+    new_build = Build(cards, owner=player.name, target_value=plan.target_value, locked=True, created_round=round_number)
     board.piles.append(new_build)
     player.remove_from_hand(card)
 
@@ -302,12 +459,14 @@ def perform_trotta(board: Board, player: Player, card: Card, round_number: int=1
 
 # Heuristic priority: best combination with mulle > best largest combination > single identical (mulle) > single match > build > trotta > discard
 
-def auto_play_turn(board: Board, player: Player, round_number: int=1) -> ActionResult:
+def auto_play_turn(board: Board, player: Player, round_number: int=1, ctx: TurnContext | None = None) -> ActionResult:
+    ctx = turn_context(board, player, ctx)
     # Try each card for best combination capture
     best_combo: Tuple[int,int,List[Pile],Card, List[List[Card]]] | None = None  # (mulle_count, size, piles, card, mulles)
-    for card in player.hand:
-        combos = generate_capture_combinations(board, card)
-        for combo in combos:
+    for card in ctx.hand:
+        if not ctx.can_capture(card):
+            continue
+        for combo in ctx.captures(card):
             # Evaluate combo
             captured_cards = []
             for pile in combo:
@@ -322,13 +481,13 @@ def auto_play_turn(board: Board, player: Player, round_number: int=1) -> ActionR
                 best_combo = (len(mulles), len(full_group), combo, card, mulles)
     if best_combo:
         _, _, combo, card, _m = best_combo
-        return perform_capture(board, player, card, combo)
+        return perform_capture(board, player, card, combo, ctx)
 
     # Single identical (mulle) or single match
     for card in player.hand:
         # Find piles with single card matching board value and same code
         single_piles = [p for p in board.piles if not isinstance(p, Build) and len(p)==1]
-        identical = [p for p in single_piles if p[0].code() == card.code()]
+        identical = [p for p in single_piles if p[0].face == card.face]
         if identical:
             return perform_capture(board, player, card, [identical[0]])
         # Any single value match (non-identical)
@@ -337,95 +496,105 @@ def auto_play_turn(board: Board, player: Player, round_number: int=1) -> ActionR
             return perform_capture(board, player, card, [value_match[0]])
 
     # Build attempt
-    for card in player.hand:
-        for pile in list(board.piles):
-            if can_build(board, player, pile, card):
-                return perform_build(board, player, pile, card, round_number)
+    for card, pile, _ in build_matrix(board, player, ctx).builds_up():
+        return perform_build(board, player, pile, card, round_number, ctx=ctx)
 
     # Try trotta before discard (if player has matching piles on board)
-    for card in player.hand:
-        try:
-            return perform_trotta(board, player, card, round_number)
-        except ValueError:
-            continue  # This card can't be trottad, try next
-
-    # Discard (will raise error if player has builds and card doesn't match build value)
-    # Optimize: if player has builds, only try cards that might feed to a build
-    has_builds = player_has_builds(board, player)
-    if has_builds:
-        # Player has builds - only try cards that match a build value (for feed)
-        player_build_values = {b.value for b in board.list_builds() if b.owner == player.name}
-        for card in player.hand:
-            if card.value_on_board() in player_build_values:
-                try:
-                    return perform_discard(board, player, card)
-                except ValueError:
-                    continue  # This card can't be discarded, try next
-    else:
-        # No builds - try any card for normal discard
-        for card in player.hand:
-            try:
-                return perform_discard(board, player, card)
-            except ValueError:
-                continue  # This card can't be discarded, try next
+    for card in ctx.hand:
+        plan = plan_trotta(board, player, card, ctx=ctx)
+        if plan is not None:
+            return apply_trotta(board, player, plan, round_number)
+
+    # Discard, or feed a matching build if the player has builds
+    options = discard_options(board, player, ctx)
+    if options:
+        return perform_discard(board, player, options[0], ctx)
 
     # If we reach here, the player cannot make any valid move (should not happen in normal gameplay)
     raise ValueError("Spelaren kan inte göra något giltigt drag - detta borde inte hända!")
 
-def enumerate_candidate_actions(board: Board, player: Player, round_number: int=1) -> List[CandidateAction]:
-    candidates: List[CandidateAction] = []
-    # Capture combinations
-    for card in list(player.hand):
-        combos = generate_capture_combinations(board, card)
-        for combo in combos:
-            captured_cards = []
-            for pile in combo:
-                if isinstance(pile, Build):
-                    captured_cards.extend(pile.cards)
-                else:
-                    captured_cards.extend(pile)
-            full_group = captured_cards + [card]
-            mulles = detect_mulles(full_group, card)
-            cat = 'capture_combo_mulle' if mulles else 'capture_combo'
-            reward = len(full_group) + 5 * len(mulles)
-            def make_executor(card_local, combo_local):
-                return lambda: perform_capture(board, player, card_local, combo_local)
-            candidates.append(CandidateAction(cat, reward, make_executor(card, combo)))
-    # Single captures (if not already covered as combos singleton) - we rely on combos; skip duplication.
-    # Build actions
-    for card in list(player.hand):
-        for pile in list(board.piles):
-            if can_build(board, player, pile, card):
-                # Predicted reward modest (potential future capture); assign small heuristic value
-                reward = 1.5
-                def make_executor(card_local, pile_local):
-                    return lambda: perform_build(board, player, pile_local, card_local, round_number)
-                candidates.append(CandidateAction('build', reward, make_executor(card, pile)))
-    # Discard fallback (only if player doesn't have builds, or card can be fed to matching build)
-    if player.hand:
-        has_builds = player_has_builds(board, player)
-        for card in player.hand:
-            # First check if card is reserved - reserved cards cannot be discarded/fed
-            reserved = is_card_reserved_for_build(board, player, card)
-            if reserved is not None:
-                continue  # Skip this card, it's reserved
-            
-            # Check if this card can be discarded
-            can_discard = False
-            if not has_builds:
-                # Player has no builds, can discard
-                can_discard = True
-            else:
-                # Player has builds - can only "discard" if card matches a build value (feed)
-                card_value = card.value_on_board()
-                player_builds_matching = [b for b in board.list_builds() if b.owner == player.name and b.value == card_value]
-                can_discard = bool(player_builds_matching)
-            
-            if can_discard:
-                def discard_exec(card=card):
-                    return perform_discard(board, player, card)
-                candidates.append(CandidateAction('discard', 0.0, discard_exec))
-                # Only add one discard option since discard is a fallback action with zero reward.
-                # Adding multiple discard options would not improve AI decision-making.
-                break
-    return candidates
+def legal_moves(board: Board, player: Player, all_discards: bool=True, ctx: TurnContext | None = None) -> List[Move]:
+    """Every legal move for ``player`` this turn, generated in one pass over the indexes.
+
+    Order: captures, build-up (including "bygga in" into an own build of the
+    same value), build-down on the opponent's open builds, trotta, feed, discard.
+    With ``all_discards=False`` only the first plain discard is listed.
+    """
+    ctx = turn_context(board, player, ctx)
+    hand = ctx.hand
+    moves: List[Move] = []
+    # Capture combinations; the subset-sum mask rules out most cards without solving
+    for card in hand:
+        if not ctx.can_capture(card):
+            continue
+        for combo in ctx.captures(card):
+            moves.append(Move("capture", card.id, tuple(p.uid for p in combo)))
+
+    matrix = build_matrix(board, player, ctx)
+    # Build up: value becomes the sum of the cards
+    for card, pile, _ in matrix.builds_up():
+        moves.append(Move("build", card.id, (pile.uid,)))
+    # Build down: the opponent's open build minus the played card
+    for card, pile, target in matrix.builds_down():
+        moves.append(Move("build", card.id, (pile.uid,), declared_value=target))
+
+    # Trotta into a new locked build (feeding an own build is listed below)
+    for card in hand:
+        plan = plan_trotta(board, player, card, ctx=ctx)
+        if plan is not None and plan.feed is None:
+            moves.append(Move("trotta", card.id, tuple(p.uid for p in plan.absorbed)))
+
+    # Feed own builds, or discard when the player has none
+    if ctx.has_builds:
+        for card in discard_options(board, player, ctx):
+            build = next(b for b in board.list_builds_by_value(card.value_on_board()) if b.owner == player.name)
+            moves.append(Move("feed", card.id, (build.uid,)))
+    elif hand:
+        # The AI only needs one zero-reward fallback discard
+        for card in hand if all_discards else hand[:1]:
+            moves.append(Move("discard", card.id))
+    return moves
+
+def candidate_moves(board: Board, player: Player, ctx: TurnContext | None = None) -> List[Move]:
+    return legal_moves(board, player, all_discards=False, ctx=ctx)
+
+def enumerate_candidate_actions(board: Board, player: Player, round_number: int=1, ctx: TurnContext | None = None) -> List[CandidateAction]:
+    ctx = turn_context(board, player, ctx)
+    return [CandidateAction(move, board, player, round_number, ctx) for move in candidate_moves(board, player, ctx)]
+
+# --- Moves as data ---
+
+def _hand_card(player: Player, card_id: int) -> Card:
+    for c in player.hand:
+        if c.id == card_id:
+            return c
+    raise ValueError(f"{CARDS[card_id].code()} finns inte på handen")
+
+def capture_features(board: Board, move: Move) -> Tuple[int, int]:
+    """(cards in the capture group incl. the played card, mulle pairs) for a capture move."""
+    faces = {}
+    size = 1
+    faces[CARDS[move.card_id].face] = 1
+    for uid in move.pile_ids:
+        pile = board.get_pile(uid)
+        for c in (pile.cards if isinstance(pile, Build) else pile):
+            faces[c.face] = faces.get(c.face, 0) + 1
+            size += 1
+    return size, sum(1 for n in faces.values() if n == 2)
+
+def apply_move(board: Board, player: Player, move: Move, round_number: int=1, ctx: TurnContext | None = None) -> ActionResult:
+    """Play ``move`` for ``player`` on ``board`` (any copy of the position it came from)."""
+    card = _hand_card(player, move.card_id)
+    piles = [board.get_pile(uid) for uid in move.pile_ids]
+    if move.kind == "capture":
+        return perform_capture(board, player, card, piles, ctx)
+    if move.kind == "build":
+        return perform_build(board, player, piles[0], card, round_number, move.declared_value, ctx)
+    if move.kind == "trotta":
+        # The rules decide which piles a trotta gathers; the recorded ones must match
+        plan = plan_trotta(board, player, card, strict=True, ctx=ctx)
+        if plan.feed is not None or tuple(p.uid for p in plan.absorbed) != move.pile_ids:
+            raise ValueError(f"Trottan med {card.code()} samlar inte de angivna högarna")
+        return apply_trotta(board, player, TrottaPlan(card, plan.target_value, absorbed=piles), round_number)
+    # Discard, or feed when the player has a build of the card's value
+    return perform_discard(board, player, card, ctx)
@@ -0,0 +1,65 @@
+"""Memo of capture solutions shared between all rule lookups.
+
+``auto_play_turn``, ``enumerate_candidate_actions``, discard validation and the
+engine helpers all ask for captures on the same board within a turn, and cards
+with equal hand value ask the very same question. The packing only depends on
+the pile values in board order and the target value, so solutions are keyed on
+``(Board.value_signature(), target)`` and stored as pile indices.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Hashable, Optional, Tuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class CaptureCache:
+    """Bounded LRU cache of capture solutions with hit/miss counters.
+
+    A lock guards every operation, so threads running games side by side can
+    share one cache.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[int, ...]]:
+        with self._lock:
+            indices = self._entries.get(key)
+            if indices is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return indices
+
+    def put(self, key: Hashable, indices: Tuple[int, ...]):
+        with self._lock:
+            self._entries[key] = indices
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide cache used by generate_capture_combinations
+capture_cache = CaptureCache()
@@ -1,18 +1,10 @@
+from ..models.card import INTAKE_POINTS, INTAKE_POINTS_1, INTAKE_POINTS_2  # tables re-exported for callers
 from ..models.player import Player
 
-# 1 point cards: SP 3-K, RU A, KL A, HJ A
-INTAKE_POINTS_1 = {"SP": ["3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"], "RU": ["A"], "HJ": ["A"], "KL": ["A"]}
-# 2 point cards: SP 2, SP A, RU 10
-INTAKE_POINTS_2 = {"SP": ["2", "A"], "RU": ["10"]}
-
 def intake_points(player: Player) -> int:
-    pts = 0
-    for c in player.captured:
-        if c.suit in INTAKE_POINTS_1 and c.rank in INTAKE_POINTS_1[c.suit]:
-            pts += 1
-        if c.suit in INTAKE_POINTS_2 and c.rank in INTAKE_POINTS_2[c.suit]:
-            pts += 2
-    return pts
+    if player.compact:
+        return player.captured.intake_points()
+    return sum(INTAKE_POINTS[c.id] for c in player.captured)
 
 class ScoreBreakdown:
     def __init__(self, player: Player, mulle_points: int, tabbe: int, intake: int, bonus: int, total: int):
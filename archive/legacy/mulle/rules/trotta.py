@@ -0,0 +1,118 @@
+"""Trotta planning without touching the board.
+
+``plan_trotta`` answers "can this card trotta, and what would it take" from
+the board indexes: the single-card value histogram decides in O(13) whether
+two singles can pair up to the card's value, and the value bucket of the
+target gives direct singles and 2-card piles. Only a card that can trotta pays
+for listing the concrete piles.
+"""
+
+from typing import TYPE_CHECKING, Dict, List
+
+from ..models.board import Board, Pile
+from ..models.build import Build
+from ..models.card import Card
+from ..models.player import Player
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .capture import TurnContext
+
+
+class TrottaPlan:
+    """What ``perform_trotta`` would do with ``card``.
+
+    Either ``feed`` is the player's own build of the card's value, or
+    ``absorbed`` lists the piles (in the order their cards join the new locked
+    build) that the card pulls together.
+    """
+
+    __slots__ = ("card", "target_value", "feed", "absorbed")
+
+    def __init__(self, card: Card, target_value: int, feed: Build | None = None, absorbed: List[Pile] | None = None):
+        self.card = card
+        self.target_value = target_value
+        self.feed = feed
+        self.absorbed = absorbed or []
+
+    @property
+    def card_count(self) -> int:
+        """Cards the resulting build gains from the board (0 when feeding)."""
+        return sum(len(p.cards if isinstance(p, Build) else p) for p in self.absorbed)
+
+    def __repr__(self):
+        if self.feed is not None:
+            return f"TrottaPlan({self.card.code()} -> feed {self.feed})"
+        return f"TrottaPlan({self.card.code()} -> absorb {len(self.absorbed)} piles)"
+
+
+def _pair_singles(board: Board, target: int) -> List[Pile]:
+    """Singles that pair with another single to ``target``, in the old i<j scan order."""
+    counts = board.single_value_counts()
+    values = [v for v in range(max(1, target - 13), min(target, 14)) if counts[v] and counts[target - v] > (2 * v == target)]
+    if not values:
+        return []
+    buckets: Dict[int, List[Pile]] = {
+        v: [p for p in board.piles_with_value(v) if not isinstance(p, Build) and len(p) == 1] for v in values
+    }
+    walk = sorted((p for bucket in buckets.values() for p in bucket), key=board.slot_of)
+    passed = dict.fromkeys(values, 0)  # singles of each value already walked past
+    listed = dict.fromkeys(values, 0)  # prefix of each bucket already added
+    seen = set()
+    ordered: List[Pile] = []
+    for pile in walk:
+        v = board.pile_value(pile)
+        passed[v] += 1
+        w = target - v
+        partners = buckets[w]
+        if len(partners) <= passed[w]:
+            continue  # no partner later on the board
+        if pile.uid not in seen:
+            seen.add(pile.uid)
+            ordered.append(pile)
+        for q in partners[max(passed[w], listed[w]):]:
+            if q.uid not in seen:
+                seen.add(q.uid)
+                ordered.append(q)
+        listed[w] = len(partners)
+    return ordered
+
+
+def plan_trotta(
+    board: Board, player: Player, card: Card, strict: bool = False, ctx: "TurnContext | None" = None
+) -> TrottaPlan | None:
+    """Plan a trotta with ``card`` without mutating anything.
+
+    Returns ``None`` when the card cannot trotta, or raises ``ValueError`` with
+    the reason when ``strict`` is set. A ``ctx`` that still describes this
+    position supplies the player's build values and reservations.
+    """
+    if ctx is not None and not ctx.matches(board, player):
+        ctx = None
+    target_value = card.value_on_board()
+
+    # Feeding the player's own build of this value is always possible
+    if ctx is None or target_value in ctx.own_build_values:
+        for build in board.list_builds_by_value(target_value):
+            if build.owner == player.name:
+                return TrottaPlan(card, target_value, feed=build)
+
+    same_value = board.piles_with_value(target_value)
+    direct_singles = [p for p in same_value if not isinstance(p, Build) and len(p) == 1]
+    two_card_matches = [p for p in same_value if len(p.cards if isinstance(p, Build) else p) == 2]
+    absorbed = direct_singles + two_card_matches + _pair_singles(board, target_value)
+    if not absorbed:
+        if strict:
+            raise ValueError(f"No piles matching value {target_value} to trotta")
+        return None
+
+    # A new locked build needs a reservation card that can capture it later
+    # (hand value, so RU 10 = 16 does not reserve a 10-build)
+    if ctx is not None:
+        reserved = ctx.has_reservation(target_value, card)
+    else:
+        reserved = any(c is not card and c.value_in_hand() == target_value for c in player.hand)
+    if not reserved:
+        if strict:
+            raise ValueError("Trotta kräver ett reservationskort med samma värde")
+        return None
+    return TrottaPlan(card, target_value, absorbed=absorbed)
@@ -0,0 +1,98 @@
+"""Reversible move application for lookahead and rollout search.
+
+While an :class:`UndoLog` is attached, ``Board`` and ``Player`` record the
+inverse of every change they make (pile added/removed, build fed or merged,
+card taken from hand, captures, mulles, tabbe). Undoing a move replays those
+inverses, so it costs O(size of the move) instead of a deepcopy of the game.
+
+    result, token = make_move(board, players, player, candidate)
+    ...evaluate...
+    unmake_move(token)
+"""
+
+from typing import Callable, List, Sequence, Tuple, Union
+
+from ..models.board import Board
+from ..models.player import Player
+from .capture import ActionResult, CandidateAction
+
+Action = Union[CandidateAction, Callable[[], ActionResult]]
+
+
+class UndoLog:
+    """Stack of inverse operations shared by a board and its players."""
+
+    def __init__(self):
+        self._entries: List[Tuple[Callable, tuple]] = []
+
+    def record(self, fn: Callable, *args):
+        self._entries.append((fn, args))
+
+    def mark(self) -> int:
+        return len(self._entries)
+
+    def rewind(self, mark: int):
+        entries = self._entries
+        while len(entries) > mark:
+            fn, args = entries.pop()
+            fn(*args)
+
+    def attach(self, board: Board, players: Sequence[Player]):
+        board._undo_log = self
+        for p in players:
+            p._undo_log = self
+
+    @staticmethod
+    def detach(board: Board, players: Sequence[Player]):
+        board._undo_log = None
+        for p in players:
+            p._undo_log = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class UndoToken:
+    """Handle returned by :func:`make_move`; pass it to :func:`unmake_move`."""
+
+    __slots__ = ("log", "mark", "board", "players", "owns_log")
+
+    def __init__(self, log: UndoLog, mark: int, board: Board, players: Sequence[Player], owns_log: bool):
+        self.log = log
+        self.mark = mark
+        self.board = board
+        self.players = players
+        self.owns_log = owns_log
+
+    def commit(self):
+        """Keep the move; stop journaling if this token started the log."""
+        if self.owns_log:
+            UndoLog.detach(self.board, self.players)
+
+
+def make_move(board: Board, players: Sequence[Player], player: Player, action: Action) -> Tuple[ActionResult, UndoToken]:
+    """Play ``action`` for ``player`` (including the tabbe rule) and return an undo token.
+
+    Moves may be nested: inner moves reuse the log attached by the outer one and
+    must be unmade first.
+    """
+    log = board._undo_log
+    owns_log = log is None
+    if owns_log:
+        log = UndoLog()
+        log.attach(board, players)
+    token = UndoToken(log, log.mark(), board, players, owns_log)
+    try:
+        result = action.execute() if hasattr(action, "execute") else action()
+        if not board.piles:
+            player.record_tabbe()
+    except Exception:
+        unmake_move(token)
+        raise
+    return result, token
+
+
+def unmake_move(token: UndoToken):
+    """Restore the board and players exactly as they were before the move."""
+    token.log.rewind(token.mark)
+    token.commit()
@@ -21,10 +21,7 @@ def player_has_builds(board: Board, player: Player) -> bool:
     Returns:
         True om spelaren har minst ett bygge, False annars
     """
-    for build in board.list_builds():
-        if build.owner == player.name:
-            return True
-    return False
+    return board.has_builds(player.name)
 
 
 def ensure_can_trail(board: Board, player: Player, card: Card = None) -> None:
@@ -0,0 +1,116 @@
+import copy
+
+from mulle.models.board import Board
+from mulle.models.build import Build
+from mulle.models.card import Card
+
+
+def _assert_index_consistent(board):
+    piles = list(board.piles)
+    assert board.value_signature() == tuple(board.pile_value(p) for p in piles)
+    assert board.list_builds() == [p for p in piles if isinstance(p, Build)]
+    for value in range(1, 17):
+        assert board.piles_with_value(value) == [p for p in piles if board.pile_value(p) == value]
+        assert board.list_builds_by_value(value) == [p for p in board.list_builds() if p.value == value]
+    counts = [0] * 14
+    for p in piles:
+        if not isinstance(p, Build) and len(p) == 1:
+            counts[p[0].value_on_board()] += 1
+    assert board.single_value_counts() == tuple(counts)
+
+
+def test_index_follows_board_changes():
+    board = Board()
+    board.add_card(Card("RU", "4", 0))
+    board.add_card(Card("KL", "7", 1))
+    board.add_pile([Card("HJ", "3", 2), Card("SP", "4", 3)])
+    build = Build([Card("SP", "9", 4), Card("HJ", "2", 5)], owner="Bo", target_value=11)
+    board.piles.append(build)
+    _assert_index_consistent(board)
+    assert board.piles_with_value(7) == [board.piles[1], board.piles[2]]
+    assert board.builds_of("Bo") == [build] and not board.has_builds("Anna")
+
+    board.remove_pile([Card("RU", "4", 0)])  # equal plain list still removes the board pile
+    created = board.create_build(board.piles[0], Card("RU", "5", 6), owner="Anna")
+    _assert_index_consistent(board)
+    assert board.builds_of("Anna") == [created]
+
+    board.piles.insert(0, [Card("KL", "A", 7)])
+    board.piles.sort(key=lambda p: board.pile_value(p))
+    _assert_index_consistent(board)
+
+    board.piles.clear()
+    _assert_index_consistent(board)
+    assert board.list_builds() == []
+
+
+def test_deepcopy_rebuilds_index():
+    board = Board()
+    board.add_card(Card("RU", "4", 0))
+    board.piles.append(Build([Card("SP", "9", 1)], owner="Bo", target_value=9))
+    clone = copy.deepcopy(board)
+
+    _assert_index_consistent(clone)
+    clone.remove_pile(clone.piles[0])
+    assert len(board.piles) == 2 and len(clone.piles) == 1
+    _assert_index_consistent(board)
+
+
+def test_piles_get_stable_handles():
+    board = Board()
+    ace = Card("KL", "A", 0)
+    board.add_card(ace)
+    board.add_card(ace)  # two piles with equal cards
+    board.add_pile([Card("HJ", "3", 1), Card("SP", "4", 2)])
+    first, second, combo = board.piles
+    assert len({first.uid, second.uid, combo.uid}) == 3
+    assert board.get_pile(second.uid) is second
+
+    board.remove_pile(second)
+    assert board.piles == [first, combo] and board.piles[0] is first
+    assert board.slot_of(combo) == 1
+    assert not board.has_pile(second)
+
+
+def test_remove_piles_compacts_once():
+    board = Board()
+    for i, rank in enumerate(["2", "3", "4", "5", "6"]):
+        board.add_card(Card("RU", rank, i))
+    keep = [board.piles[1], board.piles[3]]
+    board.remove_piles([board.piles[4], board.piles[0], board.piles[2]])
+
+    assert board.piles == keep
+    assert [board.slot_of(p) for p in keep] == [0, 1]
+    _assert_index_consistent(board)
+
+
+def test_handles_survive_copy_and_stay_unique():
+    board = Board()
+    board.add_card(Card("RU", "4", 0))
+    clone = copy.deepcopy(board)
+    assert clone.piles[0].uid == board.piles[0].uid
+    clone.add_card(Card("KL", "5", 1))
+    assert clone.piles[1].uid != clone.piles[0].uid
+
+
+def test_snapshots_share_unchanged_piles_and_stay_frozen():
+    board = Board()
+    board.add_card(Card("KL", "5", 0))
+    board.add_card(Card("SP", "3", 0))
+    board.add_card(Card("HJ", "9", 0))
+    before = board.snapshot()
+    assert board.snapshot() is before
+
+    build = board.create_build(board.piles[1], Card("RU", "4", 0), owner="Anna")
+    after_build = board.snapshot()
+    assert [c.code() for c in before.cards()] == ["KL 5", "SP 3", "HJ 9"]
+    assert after_build.piles[0] is before.piles[0] and after_build.piles[1] is before.piles[2]
+
+    board.feed_build(build, Card("KL", "7", 1))
+    fed = board.snapshot()
+    assert fed is not after_build and fed.piles[-1].locked and not after_build.piles[-1].locked
+    assert fed.piles[:2] == after_build.piles[:2] and fed.piles[1] is before.piles[2]
+
+    clone = Board.from_snapshot(fed)
+    assert clone.snapshot() == fed and clone.zhash == board.zhash
+    assert [p.uid for p in clone.piles] == [p.uid for p in board.piles]
@@ -1,7 +1,7 @@
 from mulle.models.board import Board
 from mulle.models.card import Card
 from mulle.models.player import Player
-from mulle.rules.capture import can_build, perform_build
+from mulle.rules.capture import build_matrix, can_build, perform_build
 
 
 def test_build_absorbs_and_locks():
@@ -32,3 +32,19 @@ def test_build_absorbs_and_locks():
     codes = sorted(c.code() for c in build.cards)
     for expected in ["RU 10","SP 5","SP 5","KL 3","HJ 7"]:
         assert expected in codes
+
+
+def test_build_matrix_matches_can_build():
+    from mulle.engine.game_service import GameEngine
+    from mulle.rules.capture import auto_play_turn
+
+    engine = GameEngine(seed=12, ai_enabled=False)
+
+    def selector(board, player, round_number):
+        matrix = build_matrix(board, player)
+        for i, card in enumerate(matrix.cards):
+            for j, pile in enumerate(matrix.piles):
+                assert (matrix.up[i][j] is not None) == can_build(board, player, pile, card)
+        return auto_play_turn(board, player, round_number)
+
+    engine.play_session(rounds=1, action_selector=selector)
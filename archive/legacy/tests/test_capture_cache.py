@@ -0,0 +1,71 @@
+import threading
+
+from mulle.models.board import Board
+from mulle.models.card import Card
+from mulle.rules.capture import generate_capture_combinations
+from mulle.rules.capture_cache import CaptureCache, capture_cache
+
+
+def test_same_board_and_value_hits_cache():
+    board = Board()
+    board.add_card(Card("HJ", "4", 0))
+    board.add_card(Card("KL", "3", 1))
+    board.add_card(Card("SP", "5", 2))
+    capture_cache.clear()
+
+    first = generate_capture_combinations(board, Card("KL", "7", 3))
+    second = generate_capture_combinations(board, Card("RU", "7", 4))
+
+    assert first == second
+    assert capture_cache.info().misses == 1
+    assert capture_cache.info().hits == 1
+
+
+def test_board_change_gives_new_solution():
+    board = Board()
+    board.add_card(Card("HJ", "4", 0))
+    seven = Card("KL", "7", 1)
+    assert generate_capture_combinations(board, seven) == []
+
+    version = board.version
+    board.add_card(Card("SP", "3", 2))
+    assert board.version != version
+
+    combos = generate_capture_combinations(board, seven)
+    assert combos == [[board.piles[0], board.piles[1]]]
+
+
+def test_lru_evicts_oldest_entry():
+    cache = CaptureCache(maxsize=2)
+    cache.put("a", (0,))
+    cache.put("b", (1,))
+    assert cache.get("a") == (0,)
+    cache.put("c", (2,))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == (0,)
+    assert len(cache) == 2
+
+
+def test_cache_is_safe_to_share_between_threads():
+    cache = CaptureCache(maxsize=8)
+    errors = []
+
+    def work(offset):
+        try:
+            for i in range(2000):
+                key = (offset + i) % 13
+                if cache.get(key) is None:
+                    cache.put(key, (key,))
+        except Exception as exc:  # pragma: no cover - only on a race
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    info = cache.info()
+    assert info.hits + info.misses == 8 * 2000 and info.currsize == len(cache) <= 8
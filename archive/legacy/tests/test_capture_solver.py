@@ -0,0 +1,142 @@
+import random
+from itertools import combinations
+
+from mulle.engine.game_service import GameEngine
+from mulle.models.board import Board
+from mulle.models.build import Build
+from mulle.models.card import CARDS, Card, RANKS, SUITS
+from mulle.models.packing import select_groups, select_packing, subset_sum_mask
+from mulle.rules import capture
+from mulle.rules.capture import board_pile_value, capture_possible, generate_capture_combinations
+
+
+def _reference_packing(values, target):
+    """The original exhaustive search: all subsets, then backtracking over them."""
+    masks = []
+    for r in range(1, len(values) + 1):
+        for combo in combinations(range(len(values)), r):
+            if sum(values[i] for i in combo) == target:
+                masks.append(combo)
+    masks.sort(key=lambda s: (-len(s), s))
+    best = []
+
+    def backtrack(idx, used, chosen):
+        nonlocal best
+        if sum(len(s) for s in chosen) > sum(len(s) for s in best):
+            best = list(chosen)
+        for j in range(idx, len(masks)):
+            if not used & set(masks[j]):
+                chosen.append(masks[j])
+                backtrack(j + 1, used | set(masks[j]), chosen)
+                chosen.pop()
+
+    backtrack(0, set(), [])
+    return best
+
+
+def test_packing_matches_exhaustive_search():
+    rng = random.Random(7)
+    for _ in range(400):
+        target = rng.randint(2, 13)
+        values = [rng.randint(1, target - 1) for _ in range(rng.randint(0, 10))]
+        assert select_packing(values, target) == _reference_packing(values, target)
+
+
+def _reference_groups(values, target):
+    """The original create_build absorption search: most disjoint groups."""
+    masks = []
+    for r in range(1, len(values) + 1):
+        for combo in combinations(range(len(values)), r):
+            if sum(values[i] for i in combo) == target:
+                masks.append(combo)
+    best = []
+
+    def backtrack(idx, current, used):
+        nonlocal best
+        if len(current) > len(best):
+            best = list(current)
+        for j in range(idx, len(masks)):
+            if not used & set(masks[j]):
+                current.append(masks[j])
+                backtrack(j + 1, current, used | set(masks[j]))
+                current.pop()
+
+    backtrack(0, [], set())
+    return best
+
+
+def test_absorption_groups_match_exhaustive_search():
+    rng = random.Random(13)
+    for _ in range(400):
+        target = rng.randint(2, 16)
+        values = [rng.randint(1, target - 1) for _ in range(rng.randint(0, 10))]
+        assert select_groups(values, target) == _reference_groups(values, target)
+
+
+def test_absorption_picks_short_groups_first():
+    # Shorter groups are picked first, as in the original search
+    assert select_groups([1, 1, 1, 3, 3, 3], 6) == [(3, 4), (0, 1, 2, 5)]
+
+
+def test_packing_prefers_lowest_piles_on_ties():
+    # 4+1 can use either of the two aces; the first one wins as before
+    assert select_packing([4, 1, 1], 5) == [(0, 1)]
+
+
+def test_crowded_board_capture_is_solved():
+    rng = random.Random(11)
+    board = Board()
+    for i in range(20):
+        board.add_card(Card(rng.choice(SUITS), rng.choice(RANKS[:4] + ["A"]), i))
+    board.piles.append(Build([Card("HJ", "K", 20)], owner="Bo", target_value=13))
+    king = Card("KL", "K", 21)
+
+    combos = generate_capture_combinations(board, king)
+
+    assert len(combos) == 1
+    captured = combos[0]
+    assert board.piles[-1] in captured
+    assert sum(board_pile_value(p) for p in captured) % 13 == 0
+
+
+def test_subset_sum_mask_and_capture_feasibility():
+    rng = random.Random(17)
+    for _ in range(200):
+        values = [rng.randint(1, 20) for _ in range(rng.randint(0, 8))]
+        reachable = {0} | {sum(c) for r in range(1, len(values) + 1) for c in combinations(values, r)}
+        mask = subset_sum_mask(values)
+        assert [v for v in range(17) if mask >> v & 1] == sorted(v for v in reachable if v <= 16)
+
+    for _ in range(200):
+        cards = rng.sample(CARDS, 12)
+        board = Board()
+        for c in cards[:rng.randint(0, 9)]:
+            board.add_card(c)
+        if rng.random() < 0.5:
+            board.piles.append(Build(cards[9:11], owner="Bo", target_value=rng.choice([9, 14, 15, 16])))
+        card = cards[11]
+        assert capture_possible(board, card) == bool(generate_capture_combinations(board, card))
+
+
+def test_legal_moves_only_solve_captures_for_feasible_cards(monkeypatch):
+    solved = []
+    original = capture.generate_capture_combinations
+
+    def counting(board, card):
+        solved.append(card)
+        return original(board, card)
+
+    monkeypatch.setattr(capture, "generate_capture_combinations", counting)
+    skipped = 0
+    for seed in range(5):
+        engine = GameEngine(seed=seed, ai_enabled=False)
+        engine.start_omgang(0)
+        engine.deal_hands()
+        board, player = engine.board, engine.players[0]
+        solved.clear()
+        moves = capture.legal_moves(board, player)
+        assert solved == [c for c in player.hand if capture_possible(board, c)]
+        skipped += len(player.hand) - len(solved)
+        expected = [(c.id, tuple(p.uid for p in combo)) for c in player.hand for combo in original(board, c)]
+        assert [(m.card_id, m.pile_ids) for m in moves if m.kind == "capture"] == expected
+    assert skipped
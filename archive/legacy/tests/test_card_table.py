@@ -0,0 +1,75 @@
+import pytest
+
+from mulle.models.card import (
+    BOARD_VALUE,
+    CARD_COUNT,
+    CARDS,
+    HAND_VALUE,
+    INTAKE_POINTS,
+    TWIN_ID,
+    Card,
+    card_id,
+)
+from mulle.models.deck import Deck
+from mulle.models.player import Player
+
+
+def test_table_matches_card_values():
+    assert len(CARDS) == CARD_COUNT == 104
+    for cid, card in enumerate(CARDS):
+        assert card.id == cid == card.deck_id
+        assert BOARD_VALUE[cid] == card.value_on_board()
+        assert HAND_VALUE[cid] == card.value_in_hand()
+        twin = CARDS[TWIN_ID[cid]]
+        assert twin.code() == card.code() and twin is not card
+
+
+def test_special_ids():
+    assert HAND_VALUE[card_id("SP", "2")] == 15
+    assert HAND_VALUE[card_id("RU", "10", copy=1)] == 16
+    assert BOARD_VALUE[card_id("HJ", "A")] == 1 and HAND_VALUE[card_id("HJ", "A")] == 14
+    assert INTAKE_POINTS[card_id("SP", "A")] == 2
+    assert INTAKE_POINTS[card_id("KL", "A", copy=1)] == 1
+    assert INTAKE_POINTS[card_id("SP", "5")] == 1
+    assert INTAKE_POINTS[card_id("HJ", "5")] == 0
+
+
+def test_ad_hoc_cards_share_face_with_table():
+    card = Card("KL", "9", 3)
+    assert card.face == CARDS[card.id].face
+    assert card == Card("KL", "9", 3)
+    assert card != Card("KL", "9", 4)
+    assert len({card, Card("KL", "9", 3)}) == 1
+
+
+def test_ad_hoc_twins_get_distinct_ids():
+    first, second = Card("HJ", "5", 0), Card("HJ", "5", 1)
+    assert second.id == TWIN_ID[first.id] != first.id
+    for compact in (False, True):
+        player = Player("A", compact=compact)
+        player.add_to_hand([first, second])
+        assert len(player.hand) == 2
+        assert player.hand_mask == (1 << first.id) | (1 << second.id)
+        # A third copy of a face has no id of its own in a two-deck game
+        with pytest.raises(ValueError):
+            player.add_to_hand([Card("HJ", "5", 2)])
+        assert len(player.hand) == 2
+
+
+def test_card_equality_follows_the_id():
+    first, third = Card("SP", "6", 0), Card("SP", "6", 2)
+    assert first.id == third.id and first == third and hash(first) == hash(third)
+    assert Card("SP", "6", 1) != first and Card("SP", "6", first.id) == first == CARDS[first.id]
+    for compact in (False, True):
+        player = Player("A", compact=compact)
+        # Captured cards are kept once per id, as in a CardSet
+        player.record_capture([first, Card("SP", "6", 1), third])
+        assert len(player.captured) == 2
+        assert player.captured_mask == (1 << first.id) | (1 << TWIN_ID[first.id])
+
+
+def test_deck_reuses_interned_cards():
+    deck = Deck(seed=1)
+    drawn = deck.draw_many(deck.remaining())
+    assert sorted(c.id for c in drawn) == list(range(CARD_COUNT))
+    assert all(CARDS[c.id] is c for c in drawn)
@@ -0,0 +1,123 @@
+import random
+
+from mulle.engine.game_service import GameEngine
+from mulle.models.board import Board
+from mulle.models.card import CARDS, card_id
+from mulle.models.cardset import CardSet, twin_location, twins_on_board, unseen_cards
+from mulle.models.player import Player
+from mulle.rules.capture import detect_mulles, enumerate_candidate_actions
+from mulle.rules.scoring import intake_points
+from mulle.rules.undo import make_move, unmake_move
+
+
+def test_add_remove_and_membership():
+    cards = CardSet()
+    sp2 = CARDS[card_id("SP", "2")]
+    cards.extend([sp2, CARDS[card_id("KL", "5", copy=1)]])
+    assert len(cards) == 2 and sp2 in cards
+    cards.remove(sp2)
+    assert sp2 not in cards and len(cards) == 1
+    try:
+        cards.remove(sp2)
+        assert False, "Should have raised ValueError"
+    except ValueError:
+        pass
+
+
+def test_compact_scoring_matches_list_player():
+    rng = random.Random(3)
+    picked = rng.sample(CARDS, 40)
+    regular = Player("Anna")
+    compact = Player("Anna", compact=True)
+    for p in (regular, compact):
+        p.record_capture(picked)
+        for c in picked[:6]:
+            p.record_mulle(c)
+    assert intake_points(compact) == intake_points(regular)
+    assert compact.total_mulle_points() == regular.total_mulle_points()
+
+
+def test_copy_is_independent():
+    player = Player("Bo", compact=True)
+    player.add_to_hand(CARDS[:8])
+    clone = player.copy()
+    clone.remove_from_hand(CARDS[0])
+    assert CARDS[0] in player.hand and CARDS[0] not in clone.hand
+
+
+def test_unseen_cards_excludes_hand_board_and_captured():
+    board = Board()
+    board.add_card(CARDS[10])
+    anna, bo = Player("Anna", compact=True), Player("Bo", compact=True)
+    anna.add_to_hand(CARDS[:3])
+    bo.record_capture([CARDS[20]])
+    unseen = unseen_cards(board, [anna, bo], anna)
+    assert len(unseen) == 104 - 5
+    assert CARDS[10] not in unseen and CARDS[20] not in unseen and CARDS[50] in unseen
+
+
+def test_session_runs_with_compact_players():
+    result = GameEngine(seed=5, compact_players=True).play_session(rounds=1)
+    assert len(result.omgangen[0].rounds) == 6
+    assert set(result.cumulative) == {"Anna", "Bo"}
+
+
+def _assert_locations_fresh(board, players):
+    expected = {}
+    for pile in board.piles:
+        for c in pile.cards if hasattr(pile, "cards") else pile:
+            expected[c.id] = pile
+    assert board.card_mask == CardSet(CARDS[i] for i in expected).mask
+    for cid in range(104):
+        assert board.pile_holding(cid) is expected.get(cid)
+    for p in players:
+        assert p.hand_mask == CardSet(p.hand).mask
+        assert p.captured_mask == CardSet(p.captured).mask
+        assert p.mulle_mask == CardSet(p.mulles).mask
+
+
+def test_card_locations_follow_moves_and_undo():
+    engine = GameEngine(seed=8, ai_enabled=False)
+    engine.start_omgang(0)
+    engine.deal_hands()
+    rng = random.Random(2)
+    players = engine.players
+    for ply in range(16):
+        player = players[ply % 2]
+        if not player.hand:
+            break
+        for action in enumerate_candidate_actions(engine.board, player):
+            _, token = make_move(engine.board, players, player, action)
+            _assert_locations_fresh(engine.board, players)
+            unmake_move(token)
+            _assert_locations_fresh(engine.board, players)
+        action = rng.choice(enumerate_candidate_actions(engine.board, player))
+        make_move(engine.board, players, player, action)[1].commit()
+
+
+def test_twin_queries():
+    board = Board()
+    board.add_card(CARDS[3])
+    board.add_pile([CARDS[60], CARDS[7]])
+    anna, bo = Player("Anna"), Player("Bo", compact=True)
+    anna.add_to_hand([CARDS[55], CARDS[8], CARDS[9]])
+    bo.record_capture([CARDS[61]])
+    assert twins_on_board(board, anna).ids() == [8, 55]
+    assert twin_location(CARDS[55], board, [anna, bo]) == ("board", board.piles[0])
+    assert twin_location(CARDS[8], board, [anna, bo]) == ("board", board.piles[1])
+    assert twin_location(CARDS[9], board, [anna, bo]) == ("captured", bo)
+    assert twin_location(CARDS[3], board, [anna, bo]) == ("hand", anna)
+    assert twin_location(CARDS[10], board, [anna, bo]) == ("unseen", None)
+
+
+def test_detect_mulles_pairs_twins_in_one_pass():
+    rng = random.Random(5)
+    for _ in range(200):
+        group = rng.sample(CARDS, 12) + rng.sample(CARDS[:8] + CARDS[52:60], 4)
+        group = list(dict.fromkeys(group))
+        # The old scan: count every face, then collect each pair from the group
+        counts = {}
+        for c in group:
+            counts[c.face] = counts.get(c.face, 0) + 1
+        expected = [[c for c in group if c.face == face] for face, n in counts.items() if n == 2]
+        assert detect_mulles(group, group[-1]) == expected
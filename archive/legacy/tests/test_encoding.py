@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from mulle.engine.encoding import (
+    ACTION_COUNT,
+    CARD_PLANES,
+    OBS_SIZE,
+    PILE_FEATURES,
+    ObservationBuffer,
+    action_index,
+)
+from mulle.engine.training_environment import TrainingEnvironment, VecTrainingEnvironment
+from mulle.models.card import CARD_COUNT
+from mulle.rules.capture import legal_moves
+
+
+def _plane(features, plane):
+    return {cid for cid in range(CARD_COUNT) if features[plane * CARD_COUNT + cid]}
+
+
+def test_features_describe_the_position():
+    env = TrainingEnvironment(seed=4)
+    env.reset()
+    env.step()
+    buffer = ObservationBuffer(2)
+    env.encode(buffer, 1)
+    features = buffer.feature_row(1)
+    assert len(features) == OBS_SIZE and not any(buffer.feature_row(0))
+
+    board = env.engine.board
+    anna, bo = env.engine.players
+    board_ids = {c.id for p in board.piles for c in (p.cards if hasattr(p, "cards") else p)}
+    assert _plane(features, 0) == {c.id for c in anna.hand}
+    assert _plane(features, 1) == board_ids
+    assert _plane(features, 2) == {c.id for c in anna.captured}
+    assert _plane(features, 3) == {c.id for c in bo.captured}
+    unseen = _plane(features, 4)
+    assert {c.id for c in bo.hand} <= unseen and not unseen & (board_ids | _plane(features, 0))
+    for slot, pile in enumerate(board.piles):
+        for c in pile.cards if hasattr(pile, "cards") else pile:
+            assert features[5 * CARD_COUNT + c.id] == slot + 1
+        offset = CARD_PLANES * CARD_COUNT + slot * PILE_FEATURES
+        assert features[offset] == 1 and features[offset + 1] == board.pile_value(pile)
+    assert features[CARD_PLANES * CARD_COUNT + len(board.piles) * PILE_FEATURES] == 0
+    assert list(features[-5:]) == [1, len(anna.hand), len(bo.hand), anna.tabbe, bo.tabbe]
+
+
+def test_action_mask_covers_legal_moves_and_indices_play():
+    vec = VecTrainingEnvironment(num_envs=2, seed=30)
+    observations = vec.reset()
+    rng = random.Random(1)
+    for _ in range(20):
+        actions = []
+        for env, obs in zip(vec.envs, observations):
+            board, player = env.engine.board, env.engine.players[0]
+            legal = {action_index(m, board) for m in legal_moves(board, player)}
+            mask = obs.action_mask
+            assert len(mask) == ACTION_COUNT
+            assert {i for i in range(ACTION_COUNT) if mask[i]} == legal == set(env.action_table())
+            actions.append(rng.choice(sorted(legal)))
+        observations, _, _, _ = vec.step(actions)
+
+
+def test_illegal_action_index_is_rejected():
+    env = TrainingEnvironment(seed=6)
+    env.reset()
+    illegal = next(i for i in range(ACTION_COUNT) if i not in env.action_table())
+    with pytest.raises(ValueError):
+        env.step(illegal)
+
+
+def test_every_legal_move_has_its_own_index():
+    builds = 0
+    for seed in range(8):
+        vec = VecTrainingEnvironment(num_envs=1, seed=seed, legal_actions=False)
+        vec.reset()
+        env = vec.envs[0]
+        for _ in range(40):
+            board, player = env.engine.board, env.engine.players[0]
+            moves = legal_moves(board, player)
+            table = env.action_table()
+            # Feed and discard share a block, but a player never has both
+            assert len({m.kind for m in moves} & {"feed", "discard"}) <= 1
+            assert len(table) == len(moves)
+            assert sorted(table.values(), key=moves.index) == moves
+            assert all(0 <= i < ACTION_COUNT for i in table)
+            builds += sum(m.kind == "build" for m in moves)
+            vec.step()
+    assert builds
@@ -1,3 +1,5 @@
+import random
+
 import pytest
 
 from mulle.engine.game_service import GameEngine
@@ -18,4 +20,50 @@ def test_discard_only_session_is_deterministic():
     result_b = engine_b.play_session(rounds=1, action_selector=discard_selector(engine_b))
 
     assert result_a.cumulative == result_b.cumulative == {"Anna": 0, "Bo": 0}
-    assert len(result_a.omgangen[0].rounds) == 6
\ No newline at end of file
+    assert len(result_a.omgangen[0].rounds) == 6
+
+
+def test_engines_own_their_random_streams():
+    def deal(engine, omgang):
+        engine.start_omgang(omgang)
+        engine.deal_hands()
+        return [c.id for c in engine.players[0].hand]
+
+    alone = [deal(GameEngine(seed=5), 0), deal(GameEngine(seed=5), 1)]
+
+    random.seed(0)
+    a, b = GameEngine(seed=5), GameEngine(seed=9)
+    interleaved = []
+    for omgang in range(2):
+        deal(b, omgang)
+        random.random()
+        interleaved.append(deal(a, omgang))
+    assert interleaved == alone
+    assert alone[0] != alone[1]
+    expected = random.Random(0)
+    expected.random()
+    expected.random()
+    assert random.getstate() == expected.getstate()  # global stream untouched by engines
+
+
+def test_iter_session_streams_rounds_in_every_record_mode():
+    from mulle.engine.game_service import CompactAction
+
+    expected = GameEngine(seed=2).play_session(rounds=2).cumulative
+
+    for record in ("full", "compact", "none"):
+        totals = {"Anna": 0, "Bo": 0}
+        seen = []
+        for result in GameEngine(seed=2).iter_session(rounds=2, record=record):
+            seen.append((result.omgang_index, result.round_index))
+            for s in result.scores:
+                totals[s.player.name] += s.total
+            if record == "none":
+                assert result.actions == []
+            elif record == "compact":
+                assert all(isinstance(a, CompactAction) for a in result.actions)
+        assert totals == expected
+        assert seen == [(o, r) for o in range(2) for r in range(6)]
+
+    with pytest.raises(ValueError):
+        next(GameEngine(seed=2).iter_session(rounds=1, record="everything"))
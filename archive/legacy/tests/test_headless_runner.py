@@ -1,6 +1,6 @@
 import json
 
-from mulle.engine.headless_runner import ScriptedAction, load_script, run_headless_session
+from mulle.engine.headless_runner import ScriptedAction, load_script, run_headless_session, run_parallel_sessions
 
 
 def test_scripted_actions_drive_first_turns():
@@ -31,3 +31,13 @@ def test_load_script_file(tmp_path):
     anna_actions = [name for name, _ in result.omgangen[0].rounds[0].actions if name == "Anna"]
     assert anna_actions[0] == "Anna"
     assert len(result.omgangen[0].rounds) == 6
+
+
+def test_parallel_batch_matches_serial():
+    serial = run_parallel_sessions(games=4, rounds=1, seed=7, workers=1)
+    parallel = run_parallel_sessions(games=4, rounds=1, seed=7, workers=2)
+
+    assert serial.to_dict() == parallel.to_dict()
+    assert serial.games == 4
+    assert sum(serial.wins.values()) + serial.draws == 4
+    assert {"capture_combo_mulle", "capture_combo", "build", "discard"} <= set(serial.ai_values)
@@ -0,0 +1,138 @@
+import pytest
+
+from mulle.engine.game_service import GameEngine
+from mulle.models.board import Board
+from mulle.models.build import Build
+from mulle.models.card import Card
+from mulle.models.player import Player
+from mulle.rules.capture import (
+    TurnContext,
+    auto_play_turn,
+    can_discard,
+    can_feed,
+    can_trotta,
+    discard_options,
+    generate_capture_combinations,
+    is_card_reserved_for_build,
+    perform_build,
+    perform_capture,
+    perform_discard,
+    perform_trotta,
+    turn_context,
+)
+from mulle.rules.trotta import plan_trotta
+from mulle.rules.undo import make_move, unmake_move
+
+
+def _succeeds(board, players, player, fn):
+    try:
+        result, token = make_move(board, players, player, fn)
+    except Exception:
+        return None
+    unmake_move(token)
+    return result
+
+
+def test_predicates_agree_with_perform_functions():
+    checked = 0
+    for seed in range(6):
+        engine = GameEngine(seed=seed, ai_enabled=False)
+        players = engine.players
+
+        def selector(board, player, round_number):
+            nonlocal checked
+            ctx = TurnContext(board, player)
+            for card in list(player.hand):
+                discarded = _succeeds(board, players, player, lambda: perform_discard(board, player, card))
+                assert can_discard(board, player, card) == (discarded is not None)
+                # With builds on the board a discard can only be a feed
+                assert can_feed(board, player, card) == (discarded is not None and board.has_builds(player.name))
+                trotted = _succeeds(board, players, player, lambda: perform_trotta(board, player, card, round_number))
+                assert can_trotta(board, player, card) == (trotted is not None)
+                assert can_trotta(board, player, card, ctx) == (trotted is not None)
+                checked += 1
+            assert discard_options(board, player) == [c for c in player.hand if can_discard(board, player, c)]
+            return auto_play_turn(board, player, round_number)
+
+        engine.play_session(rounds=1, action_selector=selector)
+    assert checked > 500
+
+
+def test_turn_context_is_shared_and_refreshed():
+    board = Board()
+    board.piles.append(Build([Card("KL", "4", 0), Card("HJ", "5", 1)], owner="Anna", target_value=9))
+    board.piles.append(Build([Card("SP", "3", 2), Card("HJ", "3", 3)], owner="Bo", target_value=6))
+    anna = Player("Anna")
+    nine, two = Card("RU", "9", 4), Card("KL", "2", 5)
+    anna.add_to_hand([nine, two])
+
+    ctx = TurnContext(board, anna)
+    assert ctx.reserved_build(nine) is board.piles[0]
+    assert is_card_reserved_for_build(board, anna, two, ctx) is None
+    assert ctx.own_build_values == {9} and ctx.blocked_values == {6}
+    assert ctx.hand_values == {9: 1, 2: 1}
+    assert not can_discard(board, anna, two, ctx) and turn_context(board, anna, ctx) is ctx
+
+    anna.add_to_hand([Card("SP", "9", 6)])
+    assert turn_context(board, anna, ctx) is not ctx
+    assert is_card_reserved_for_build(board, anna, nine, ctx) is None
+
+
+def test_perform_functions_use_the_turn_context():
+    board = Board()
+    board.piles.append(Build([Card("KL", "4", 0), Card("HJ", "5", 1)], owner="Anna", target_value=9))
+    board.add_card(Card("SP", "7", 2))
+    board.add_card(Card("RU", "3", 3))
+    anna = Player("Anna")
+    nine, seven, two = Card("RU", "9", 4), Card("HJ", "7", 5), Card("KL", "2", 6)
+    anna.add_to_hand([nine, seven, two])
+    ctx = TurnContext(board, anna)
+
+    assert generate_capture_combinations(board, seven, ctx) is ctx.captures(seven)
+    for card in anna.hand:
+        assert can_trotta(board, anna, card, ctx) == can_trotta(board, anna, card)
+        assert repr(plan_trotta(board, anna, card, ctx=ctx)) == repr(plan_trotta(board, anna, card))
+    # The only card that can take the 9-build may not be built away either
+    with pytest.raises(ValueError, match="reserved"):
+        perform_build(board, anna, board.piles[1], nine, ctx=ctx)
+    assert len(anna.hand) == 3 and len(board.piles) == 3
+
+    # Without a chosen combination the solver's capture is played
+    result = perform_capture(board, anna, nine, ctx=ctx)
+    assert len(result.captured) == 3
+    assert [p[0].code() for p in board.piles] == ["SP 7", "RU 3"]
+    # The stale context is not trusted after the capture
+    assert not ctx.matches(board, anna)
+    assert generate_capture_combinations(board, seven, ctx) == [[board.piles[0]]]
+    assert not can_trotta(board, anna, seven, ctx)
+
+
+def test_turn_context_caches_survive_temporary_cards():
+    board = Board()
+    board.add_card(Card("KL", "3", 0))
+    board.add_card(Card("HJ", "4", 1))
+    anna = Player("Anna")
+    ctx = TurnContext(board, anna)
+    # Temporary cards are freed right away, so their addresses get reused
+    for _ in range(3):
+        seven = generate_capture_combinations(board, Card("RU", "7", 2), ctx)
+        assert seven == generate_capture_combinations(board, Card("RU", "7", 2))
+        assert generate_capture_combinations(board, Card("RU", "3", 3), ctx) == [[board.piles[0]]]
+
+
+def test_perform_build_checks_reservations_only_with_a_context():
+    def position():
+        board = Board()
+        board.piles.append(Build([Card("KL", "4", 0), Card("HJ", "5", 1)], owner="Anna", target_value=9))
+        board.add_card(Card("SP", "3", 2))
+        anna = Player("Anna")
+        anna.add_to_hand([Card("RU", "9", 3), Card("KL", "2", 4)])
+        return board, anna
+
+    board, anna = position()
+    with pytest.raises(ValueError, match="reserved"):
+        perform_build(board, anna, board.piles[1], anna.hand[0], ctx=TurnContext(board, anna))
+    # Callers without a context (e.g. GameEngine.play_build) build as before
+    board, anna = position()
+    assert perform_build(board, anna, board.piles[1], anna.hand[0]).build_created
+    assert [c.code() for c in anna.hand] == ["KL 2"]
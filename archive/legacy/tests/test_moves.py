@@ -0,0 +1,122 @@
+import copy
+import pickle
+
+import pytest
+
+from mulle.engine.game_service import GameEngine
+from mulle.models.board import Board
+from mulle.models.build import Build
+from mulle.models.card import Card
+from mulle.models.move import Move
+from mulle.models.player import Player
+from mulle.rules.capture import (
+    apply_move,
+    auto_play_turn,
+    can_build,
+    can_trotta,
+    candidate_moves,
+    enumerate_candidate_actions,
+    legal_moves,
+)
+from mulle.rules.undo import make_move, unmake_move
+
+
+def _position(seed=8):
+    engine = GameEngine(seed=seed, ai_enabled=False)
+    engine.start_omgang(0)
+    engine.deal_hands()
+    return engine.board, engine.players[0]
+
+
+def test_moves_are_hashable_and_picklable():
+    board, player = _position()
+    moves = candidate_moves(board, player)
+    assert moves and len(set(moves)) == len(moves)
+    assert pickle.loads(pickle.dumps(moves)) == moves
+    assert Move("build", 3, [7]) == Move("build", 3, (7,))
+    assert hash(Move("discard", 3)) != hash(Move("discard", 4))
+
+
+def test_move_applies_to_a_cloned_position():
+    board, player = _position()
+    for move in candidate_moves(board, player):
+        left_board, left_player = copy.deepcopy(board), player.copy()
+        right_board, right_player = copy.deepcopy(board), player.copy()
+        left = apply_move(left_board, left_player, move)
+        right = apply_move(right_board, right_player, move)
+        assert [c.id for c in left.captured] == [c.id for c in right.captured]
+        assert repr(left_board) == repr(right_board)
+        assert left_board.zhash == right_board.zhash
+
+
+def test_candidate_reward_is_lazy_and_survives_execution():
+    board, player = _position()
+    actions = enumerate_candidate_actions(board, player)
+    assert all(a._features is None for a in actions)
+    capture = next(a for a in actions if a.move.kind == "capture")
+    capture.execute()
+    assert capture.category.startswith("capture_combo") and capture.predicted_reward >= 2
+
+
+def test_legal_moves_include_build_down_and_trotta():
+    board = Board()
+    board.piles.append(Build([Card("KL", "5", 0), Card("HJ", "4", 1)], owner="Bo", target_value=9))
+    board.add_card(Card("SP", "7", 2))
+    anna = Player("Anna")
+    three, six, seven = Card("RU", "3", 3), Card("HJ", "6", 4), Card("KL", "7", 5)
+    anna.add_to_hand([three, six, seven, Card("HJ", "7", 6)])
+
+    moves = legal_moves(board, anna)
+    down = Move("build", three.id, (board.piles[0].uid,), declared_value=6)
+    assert down in moves
+    assert Move("trotta", seven.id, (board.piles[1].uid,)) in moves
+    assert Move("discard", six.id) in moves
+
+    apply_move(board, anna, down)
+    build = board.list_builds()[0]
+    assert build.owner == "Anna" and build.value == 6 and len(build.cards) == 3
+    assert [m.kind for m in legal_moves(board, anna)].count("discard") == 0
+
+
+def test_trotta_move_applies_its_recorded_piles():
+    board = Board()
+    board.add_card(Card("SP", "7", 0))
+    board.add_card(Card("KL", "3", 0))
+    board.add_card(Card("HJ", "4", 0))
+    anna = Player("Anna")
+    seven = Card("KL", "7", 0)
+    anna.add_to_hand([seven, Card("HJ", "7", 0)])
+    trotta = next(m for m in legal_moves(board, anna) if m.kind == "trotta")
+    assert len(trotta.pile_ids) == 3
+
+    clone, clone_anna = copy.deepcopy(board), anna.copy()
+    partial = Move("trotta", seven.id, trotta.pile_ids[:1])
+    with pytest.raises(ValueError):
+        apply_move(clone, clone_anna, partial)
+    assert len(clone.piles) == 3 and len(clone_anna.hand) == 2
+
+    apply_move(board, anna, trotta)
+    build = board.list_builds()[0]
+    assert build.locked and len(build.cards) == 4 and len(board.piles) == 1
+
+
+def test_legal_moves_apply_and_match_predicates():
+    for seed in range(4):
+        engine = GameEngine(seed=seed, ai_enabled=False)
+        players = engine.players
+
+        def selector(board, player, round_number):
+            moves = legal_moves(board, player)
+            assert moves
+            builds = {(m.card_id, m.pile_ids[0]) for m in moves if m.kind == "build" and m.declared_value is None}
+            assert builds == {
+                (c.id, p.uid) for c in player.hand for p in board.piles if can_build(board, player, p, c)
+            }
+            trotta = {m.card_id for m in moves if m.kind == "trotta"}
+            assert trotta <= {c.id for c in player.hand if can_trotta(board, player, c)}
+            for move in moves:
+                _, token = make_move(board, players, player, lambda: apply_move(board, player, move, round_number))
+                unmake_move(token)
+            return auto_play_turn(board, player, round_number)
+
+        engine.play_session(rounds=1, action_selector=selector)
@@ -0,0 +1,56 @@
+import gc
+from multiprocessing import shared_memory
+
+import pytest
+
+from mulle.engine.encoding import ACTION_COUNT
+from mulle.engine.subproc_environment import SubprocVecTrainingEnvironment
+from mulle.engine.training_environment import VecTrainingEnvironment
+
+
+def test_worker_processes_match_in_process_games():
+    reference = VecTrainingEnvironment(num_envs=5, seed=3, legal_actions=False)
+    reference.reset()
+    with SubprocVecTrainingEnvironment(num_envs=5, seed=3, workers=2) as env:
+        buffer = env.reset()
+        assert bytes(buffer.features) == reference.buffer.features.tobytes()
+        finished = 0
+        for _ in range(20):
+            buffer, rewards, dones, infos = env.step()
+            _, expected_rewards, expected_dones, expected_infos = reference.step()
+            assert list(rewards) == expected_rewards
+            assert [bool(d) for d in dones] == expected_dones
+            assert [i.get("scores") for i in infos] == [i.get("scores") for i in expected_infos]
+            assert bytes(buffer.features) == reference.buffer.features.tobytes()
+            assert bytes(buffer.masks) == reference.buffer.masks.tobytes()
+            finished += sum(expected_dones)
+        assert finished
+    # The results are copies and outlive the environment
+    assert bytes(buffer.features) == reference.buffer.features.tobytes()
+
+
+def test_worker_errors_are_reported():
+    with SubprocVecTrainingEnvironment(num_envs=2, seed=1, workers=2) as env:
+        buffer = env.reset()
+        illegal = next(i for i in range(ACTION_COUNT) if not buffer.masks[i])
+        with pytest.raises(RuntimeError, match="Otillåtet drag"):
+            env.step([illegal, None])
+        with pytest.raises(ValueError):
+            env.step([None])
+        # The other worker has stepped already, so the games must be reset first
+        with pytest.raises(RuntimeError, match="reset"):
+            env.step()
+        env.reset()
+        env.step()
+
+
+def test_unclosed_environment_frees_its_shared_block():
+    env = SubprocVecTrainingEnvironment(num_envs=2, seed=1, workers=2)
+    env.reset()
+    name = env._shm_name
+    procs = list(env._procs)
+    del env
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+    assert not any(p.is_alive() for p in procs)
@@ -1,4 +1,6 @@
-from mulle.engine.training_environment import TrainingEnvironment
+import pytest
+
+from mulle.engine.training_environment import TrainingEnvironment, TrainingObservation
 
 
 def test_reset_sets_up_single_round():
@@ -40,3 +42,102 @@ def test_episode_runs_to_completion():
 
     assert done
     assert "scores" in info
+
+
+def test_vector_environment_matches_single_games_and_auto_resets():
+    from mulle.engine.training_environment import VecTrainingEnvironment
+
+    vec = VecTrainingEnvironment(num_envs=3, seed=10)
+    singles = [TrainingEnvironment(seed=10 + i) for i in range(3)]
+    observations = vec.reset()
+    for env, obs in zip(singles, observations):
+        assert [c.id for c in env.reset().hand] == [c.id for c in obs.hand]
+
+    finished = [0] * 3
+    for _ in range(12):
+        observations, rewards, dones, infos = vec.step()
+        for i, env in enumerate(singles):
+            _, reward, done, info = env.step()
+            assert rewards[i] == reward and dones[i] == done
+            if done:
+                assert infos[i]["scores"] == info["scores"]
+                assert "final_observation" in infos[i]
+                finished[i] += 1
+                # The next game is dealt from a fresh shuffle
+                first = env.reset(finished[i])
+                assert [c.id for c in observations[i].hand] == [c.id for c in first.hand]
+    assert all(finished)
+
+
+def test_observations_do_not_change_as_the_game_goes_on():
+    env = TrainingEnvironment(seed=5)
+    obs = env.reset()
+    board = [[c.code() for c in pile.cards] for pile in obs.board]
+    hand = list(obs.hand)
+    for _ in range(3):
+        env.step()
+    assert [[c.code() for c in pile.cards] for pile in obs.board] == board
+    assert list(obs.hand) == hand and len(env.engine.players[0].hand) == len(hand) - 3
+
+
+def test_legal_actions_are_computed_lazily_once_per_position(monkeypatch):
+    from mulle.engine import training_environment
+
+    calls = []
+    original = training_environment.legal_moves
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(training_environment, "legal_moves", counting)
+    env, reference = TrainingEnvironment(seed=7), TrainingEnvironment(seed=7)
+    first = env.reset()
+    reference.reset()
+    assert not calls
+    # Candidates and the action table share one legal_moves pass
+    assert first.legal_actions is first.legal_actions is env.legal_actions()
+    assert env.action_table() and len(calls) == 1
+
+    index = next(iter(env.action_table()))
+    skipped, _, _, _ = env.step(index)
+    env.step(next(iter(env.action_table())))
+    assert len(calls) == 2
+    # Actions read in time stay memoized, and an observation read after the
+    # game moved on lists its own position's actions from the snapshot
+    stale = skipped.legal_actions
+    assert first.legal_actions and len(calls) == 2
+    reference.step(index)
+    assert [a.move for a in stale] == [a.move for a in reference.legal_actions()]
+    # They are not playable in the game any more
+    with pytest.raises(ValueError):
+        env.step(stale[0])
+
+
+def test_reset_does_not_reuse_actions_of_the_previous_game():
+    env = TrainingEnvironment(seed=1)
+    env.reset()
+    old = env.legal_actions()
+    # The same deal again: equal position, but a new board
+    env.reset()
+    assert env.legal_actions() is not old
+    assert all(a.plays_on(env.engine.board, env.engine.players[0]) for a in env.legal_actions())
+    env.step(env.legal_actions()[0])
+
+
+def test_legal_actions_can_be_skipped():
+    env = TrainingEnvironment(seed=7, legal_actions=False)
+    obs = env.reset()
+    assert obs.legal_actions == []
+    obs, _, done, _ = env.step()
+    assert not done and obs.legal_actions == [] and env.action_table()
+
+
+def test_observations_can_still_be_built_with_legal_actions():
+    env = TrainingEnvironment(seed=3)
+    obs = env.reset()
+    actions = env.legal_actions()
+    built = TrainingObservation(obs.board, obs.hand, obs.opponent_cards, obs.round_number, actions)
+    assert built.legal_actions is actions
+    assert TrainingObservation(obs.board, obs.hand, 8, 1, legal_actions=actions).legal_actions is actions
+    assert TrainingObservation(obs.board, obs.hand, 8, 1).legal_actions == []
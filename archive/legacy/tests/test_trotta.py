@@ -1,7 +1,11 @@
+import pytest
+
+from mulle.engine.game_service import GameEngine
 from mulle.models.board import Board
 from mulle.models.card import Card
 from mulle.models.player import Player
 from mulle.rules.capture import perform_trotta
+from mulle.rules.trotta import plan_trotta
 
 
 def test_trotta_creates_locked_build():
@@ -55,3 +59,72 @@ def test_trotta_fails_without_matches():
     except ValueError as e:
         assert "No piles matching value 8" in str(e)
 
+
+def _reference_matches(board, target):
+    """The old perform_trotta scan: direct singles, 2-card piles, then single pairs."""
+    direct = [p for p in board.piles if isinstance(p, list) and len(p) == 1 and board.pile_value(p) == target]
+    two = [p for p in board.piles if board.pile_value(p) == target and len(p.cards if hasattr(p, "cards") else p) == 2]
+    singles = [p for p in board.piles if isinstance(p, list) and len(p) == 1]
+    for i in range(len(singles)):
+        for j in range(i + 1, len(singles)):
+            p1, p2 = singles[i], singles[j]
+            if p1[0].value_on_board() + p2[0].value_on_board() == target:
+                for p in (p1, p2):
+                    if all(p is not q for q in two + direct):
+                        two.append(p)
+    return direct + two
+
+
+def test_plan_matches_old_scan_without_mutating():
+    import random
+
+    from mulle.models.build import Build
+    from mulle.models.card import CARDS
+    from mulle.rules.trotta import plan_trotta
+
+    rng = random.Random(21)
+    for _ in range(300):
+        cards = rng.sample(CARDS[:52], 18)
+        board = Board()
+        for i, c in enumerate(cards[:10]):
+            if i < 3 and rng.random() < 0.3:
+                board.add_pile([c, cards[10 + i]])
+            else:
+                board.add_card(c)
+        if rng.random() < 0.3:
+            board.piles.append(Build(cards[13:15], owner="Bo", target_value=rng.randint(2, 13)))
+        player = Player("Anna")
+        # The second copy of the first card is always a reservation for it
+        player.add_to_hand(cards[15:18] + [CARDS[cards[15].id + 52]])
+        version = board.version
+        for card in player.hand:
+            plan = plan_trotta(board, player, card)
+            expected = _reference_matches(board, card.value_on_board())
+            reserved = any(c is not card and c.value_in_hand() == card.value_on_board() for c in player.hand)
+            if not expected or not reserved:
+                assert plan is None
+            else:
+                assert [p.uid for p in plan.absorbed] == [p.uid for p in expected]
+        assert board.version == version
+
+
+def test_ruter_10_does_not_reserve_a_ten_build():
+    # RU 10 is 10 on the board but 16 in hand, so it can never take a 10-build
+    board = Board()
+    board.add_card(Card("KL", "10", 0))
+    player = Player("Anna")
+    sp10, ru10 = Card("SP", "10", 0), Card("RU", "10", 0)
+    player.add_to_hand([sp10, ru10])
+    assert plan_trotta(board, player, sp10) is None
+    with pytest.raises(ValueError, match="reservationskort"):
+        perform_trotta(board, player, sp10)
+    player.add_to_hand([Card("HJ", "10", 0)])
+    assert plan_trotta(board, player, sp10) is not None
+
+
+@pytest.mark.parametrize("seed, ai_enabled, rounds", [(10, True, 1), (63, True, 2), (101, False, 2)])
+def test_sessions_do_not_reach_a_dead_end(seed, ai_enabled, rounds):
+    # Reserving with the board value let these games trotta into a build nobody
+    # could take, ending in "kan inte göra något giltigt drag"
+    result = GameEngine(seed=seed, ai_enabled=ai_enabled).play_session(rounds=rounds)
+    assert len(result.omgangen[0].rounds) == 6
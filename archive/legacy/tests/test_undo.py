@@ -0,0 +1,75 @@
+import random
+
+from mulle.engine.game_service import GameEngine
+from mulle.models.board import Board
+from mulle.models.build import Build
+from mulle.models.card import Card
+from mulle.models.player import Player
+from mulle.rules.capture import enumerate_candidate_actions, perform_build
+from mulle.rules.undo import make_move, unmake_move
+
+
+def _snapshot(board, players):
+    piles = []
+    for p in board.piles:
+        if isinstance(p, Build):
+            piles.append(("B", p.uid, p.owner, p.value, p.locked, tuple(p.cards)))
+        else:
+            piles.append(("P", p.uid, tuple(p)))
+    people = [(tuple(p.hand), tuple(p.captured), tuple(p.mulles), p.tabbe) for p in players]
+    return piles, people, board.value_signature(), [b.uid for b in board.list_builds()]
+
+
+def test_capture_with_mulle_and_tabbe_is_undone():
+    board = Board()
+    board.add_card(Card("KL", "9", 0))
+    anna, bo = Player("Anna"), Player("Bo")
+    nine = Card("KL", "9", 1)
+    anna.add_to_hand([Card("SP", "3", 2), nine])
+    before = _snapshot(board, [anna, bo])
+
+    action = [a for a in enumerate_candidate_actions(board, anna) if a.category == "capture_combo_mulle"][0]
+    result, token = make_move(board, [anna, bo], anna, action)
+    assert result.mulle_pairs and anna.tabbe == 1 and not board.piles
+
+    unmake_move(token)
+    assert _snapshot(board, [anna, bo]) == before
+    assert board._undo_log is None and anna._undo_log is None
+
+
+def test_build_merge_and_feed_are_undone():
+    board = Board()
+    board.add_card(Card("RU", "4", 0))
+    board.add_card(Card("KL", "7", 1))
+    board.piles.append(Build([Card("SP", "9", 2), Card("HJ", "2", 3)], owner="Anna", target_value=11))
+    anna, bo = Player("Anna"), Player("Bo")
+    anna.add_to_hand([Card("HJ", "7", 4), Card("SP", "J", 5), Card("KL", "J", 6)])
+    before = _snapshot(board, [anna, bo])
+
+    _, outer = make_move(board, [anna, bo], anna, lambda: perform_build(board, anna, board.piles[0], anna.hand[0]))
+    assert len(board.list_builds()[0].cards) == 4  # merged into the existing 11-build
+    after_build = _snapshot(board, [anna, bo])
+    _, inner = make_move(board, [anna, bo], anna, enumerate_candidate_actions(board, anna)[-1])
+    unmake_move(inner)
+    assert _snapshot(board, [anna, bo]) == after_build
+    unmake_move(outer)
+    assert _snapshot(board, [anna, bo]) == before
+
+
+def test_random_lines_restore_engine_state():
+    rng = random.Random(4)
+    engine = GameEngine(seed=9, ai_enabled=False)
+    engine.start_omgang(0)
+    engine.deal_hands()
+    board, players = engine.board, engine.players
+    before = _snapshot(board, players)
+    tokens = []
+    for ply in range(8):
+        player = players[ply % 2]
+        actions = enumerate_candidate_actions(board, player)
+        if not actions:
+            break
+        tokens.append(make_move(board, players, player, rng.choice(actions))[1])
+    for token in reversed(tokens):
+        unmake_move(token)
+    assert _snapshot(board, players) == before
@@ -0,0 +1,71 @@
+import random
+
+from mulle.engine.game_service import GameEngine
+from mulle.models.board import Board
+from mulle.models.card import Card
+from mulle.models.player import Player
+from mulle.models.zobrist import state_hash
+from mulle.rules.capture import auto_play_turn, enumerate_candidate_actions
+from mulle.rules.undo import make_move, unmake_move
+
+
+def _assert_hash_fresh(board, players):
+    assert board.zhash == board.compute_zhash()
+    for p in players:
+        assert p.zhash == p.compute_zhash()
+
+
+def test_hash_tracks_whole_session():
+    engine = GameEngine(seed=3, ai_enabled=False)
+    seen = []
+
+    def selector(board, player, round_number):
+        result = auto_play_turn(board, player, round_number)
+        _assert_hash_fresh(board, engine.players)
+        seen.append(engine.state_hash())
+        return result
+
+    engine.play_session(rounds=1, action_selector=selector)
+    assert len(set(seen)) > len(seen) // 2
+
+
+def test_hash_is_restored_by_unmake():
+    engine = GameEngine(seed=11, ai_enabled=False)
+    engine.start_omgang(0)
+    engine.deal_hands()
+    rng = random.Random(5)
+    players = engine.players
+    for ply in range(12):
+        player = players[ply % 2]
+        if not player.hand:
+            break
+        before = engine.state_hash()
+        for action in enumerate_candidate_actions(engine.board, player):
+            _, token = make_move(engine.board, players, player, action)
+            _assert_hash_fresh(engine.board, players)
+            unmake_move(token)
+            assert engine.state_hash() == before
+        action = rng.choice(enumerate_candidate_actions(engine.board, player))
+        make_move(engine.board, players, player, action)[1].commit()
+
+
+def test_hash_distinguishes_piles_builds_and_seats():
+    five, three, two = Card("KL", "5", 0), Card("SP", "3", 0), Card("HJ", "2", 0)
+    split, joined = Board(), Board()
+    split.add_card(three)
+    split.add_card(two)
+    joined.add_pile([three, two])
+    assert split.zhash != joined.zhash
+
+    board = Board()
+    board.add_card(three)
+    anna, bo = Player("Anna"), Player("Bo")
+    build = board.create_build(board.piles[0], two, owner="Anna")
+    open_hash = board.zhash
+    board.feed_build(build, five)
+    assert build.locked and board.zhash != open_hash
+    assert board.zhash == board.compute_zhash()
+
+    anna.add_to_hand([five])
+    assert state_hash(board, [anna, bo], 1) != state_hash(board, [bo, anna], 1)
+    assert state_hash(board, [anna, bo], 1) != state_hash(board, [anna, bo], 2)